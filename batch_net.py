@@ -0,0 +1,165 @@
+import numpy as np
+from neat.graphs import feed_forward_layers
+
+from inference import ACTIVATIONS
+
+
+class BatchNetwork:
+    """
+    The feed forward networks of a whole generation packed into flat NumPy arrays.
+    Every genome owns `num_slots` consecutive values, node i of layer L of every
+    genome is evaluated together with the other genomes' layer L nodes.
+    """
+
+    def __init__(self, num_genomes, num_inputs, num_outputs, num_slots, layers):
+        self.num_genomes = num_genomes
+        self.num_inputs = num_inputs
+        self.num_outputs = num_outputs
+        self.num_slots = num_slots
+        self.layers = layers
+
+        genome_offsets = np.arange(num_genomes)[:, None] * num_slots
+        self.input_index = (genome_offsets + np.arange(num_inputs)).reshape(-1)
+        self.output_index = (genome_offsets + num_inputs + np.arange(num_outputs)).reshape(-1)
+
+    def activate(self, inputs):
+        """
+        inputs: array of shape (..., num_genomes, num_inputs)
+        returns: array of shape (..., num_genomes, num_outputs), the same values
+        neat.nn.FeedForwardNetwork.activate gives for every genome
+        """
+        inputs = np.asarray(inputs, dtype=np.float64)
+        if inputs.shape[-2:] != (self.num_genomes, self.num_inputs):
+            raise RuntimeError("Expected inputs of shape (..., {0:n}, {1:n}), got {2}".format(
+                self.num_genomes, self.num_inputs, inputs.shape))
+        batch_shape = inputs.shape[:-2]
+        inputs = inputs.reshape(int(np.prod(batch_shape)), self.num_genomes * self.num_inputs)
+
+        values = np.zeros((inputs.shape[0], self.num_genomes * self.num_slots))
+        values[:, self.input_index] = inputs
+
+        for nodes, bias, response, activations, sources, weights, starts, unconnected in self.layers:
+            if len(sources):
+                s = np.add.reduceat(values[:, sources] * weights, starts, axis=1)
+                s[:, unconnected] = 0.0
+            else:
+                s = np.zeros((values.shape[0], len(nodes)))
+            z = bias + response * s
+            if len(activations) == 1:
+                values[:, nodes] = ACTIVATIONS[activations[0][0]](z)
+            else:
+                for name, selection in activations:
+                    values[:, nodes[selection]] = ACTIVATIONS[name](z[:, selection])
+
+        outputs = values[:, self.output_index]
+        return outputs.reshape(batch_shape + (self.num_genomes, self.num_outputs))
+
+    def take(self, genome_index):
+        """
+        Returns a BatchNetwork whose genome i is genome genome_index[i] of this one, so the
+        networks of the live drones can be packed again after some of them are resolved.
+        """
+        genome_index = np.asarray(genome_index, dtype=np.int64)
+        num_slots = self.num_slots
+        new_genome = np.arange(len(genome_index))
+        layers = []
+        for nodes, bias, response, activations, sources, weights, starts, unconnected in self.layers:
+            # layer nodes of every selected genome, in genome order
+            node_genome = nodes // num_slots
+            order = np.argsort(node_genome, kind="stable")
+            counts = np.bincount(node_genome, minlength=self.num_genomes)
+            first = np.cumsum(counts) - counts
+            old_nodes = order[repeat_ranges(first[genome_index], counts[genome_index])]
+            node_owner = np.repeat(new_genome, counts[genome_index])
+            if len(old_nodes) == 0:
+                continue
+            # nodes without links stay in front
+            front = np.argsort(~unconnected[old_nodes], kind="stable")
+            old_nodes = old_nodes[front]
+            node_owner = node_owner[front]
+
+            edge_counts = np.diff(np.append(starts, len(sources)))
+            edge_counts[unconnected] = 0
+            new_counts = edge_counts[old_nodes]
+            old_edges = repeat_ranges(starts[old_nodes], new_counts)
+            edge_owner = np.repeat(node_owner, new_counts)
+
+            activation_names = np.empty(len(nodes), dtype=object)
+            for name, selection in activations:
+                activation_names[selection] = name
+            new_names = activation_names[old_nodes]
+            new_activations = [(name, np.flatnonzero(new_names == name)) for name in sorted(set(new_names))]
+
+            layers.append((node_owner * num_slots + nodes[old_nodes] % num_slots, bias[old_nodes],
+                           response[old_nodes], new_activations,
+                           edge_owner * num_slots + sources[old_edges] % num_slots, weights[old_edges],
+                           np.cumsum(new_counts) - new_counts, unconnected[old_nodes]))
+
+        return BatchNetwork(len(genome_index), self.num_inputs, self.num_outputs, num_slots, layers)
+
+    @staticmethod
+    def create(genomes, config):
+        """ Receives a list of genomes and returns their phenotypes packed in one BatchNetwork. """
+        genome_config = config.genome_config
+        input_keys = genome_config.input_keys
+        output_keys = genome_config.output_keys
+        num_inputs = len(input_keys)
+        num_outputs = len(output_keys)
+
+        # node evaluations of every genome grouped by layer depth
+        depth_evals = []
+        num_slots = num_inputs + num_outputs
+        for genome_idx, genome in enumerate(genomes):
+            connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+            layers = feed_forward_layers(input_keys, output_keys, connections)
+
+            slots = {key: i for i, key in enumerate(input_keys + output_keys)}
+            for layer in layers:
+                for node in layer:
+                    if node not in slots:
+                        slots[node] = len(slots)
+            num_slots = max(num_slots, len(slots))
+
+            for depth, layer in enumerate(layers):
+                if depth == len(depth_evals):
+                    depth_evals.append([])
+                for node in sorted(layer):
+                    ng = genome.nodes[node]
+                    if ng.aggregation != "sum":
+                        raise ValueError("Unsupported aggregation function: {0}".format(ng.aggregation))
+                    if ng.activation not in ACTIVATIONS:
+                        raise ValueError("Unsupported activation function: {0}".format(ng.activation))
+                    links = [(slots[inode], genome.connections[(inode, onode)].weight)
+                             for inode, onode in connections if onode == node]
+                    depth_evals[depth].append((genome_idx, slots[node], ng.activation, ng.bias, ng.response, links))
+
+        layers = []
+        for evals in depth_evals:
+            # nodes without links first, so np.add.reduceat never sees an out of range start
+            evals.sort(key=lambda e: (len(e[5]) > 0, e[2]))
+            nodes, bias, response, sources, weights, starts = [], [], [], [], [], []
+            activations = []
+            for i, (genome_idx, slot, activation, node_bias, node_response, links) in enumerate(evals):
+                nodes.append(genome_idx * num_slots + slot)
+                bias.append(node_bias)
+                response.append(node_response)
+                starts.append(len(sources))
+                for source, weight in links:
+                    sources.append(genome_idx * num_slots + source)
+                    weights.append(weight)
+                if not activations or activations[-1][0] != activation:
+                    activations.append((activation, []))
+                activations[-1][1].append(i)
+            unconnected = np.array([len(e[5]) == 0 for e in evals])
+            activations = [(name, np.array(selection)) for name, selection in activations]
+            layers.append((np.array(nodes), np.array(bias), np.array(response), activations,
+                           np.array(sources, dtype=np.int64), np.array(weights), np.array(starts, dtype=np.int64),
+                           unconnected))
+
+        return BatchNetwork(len(genomes), num_inputs, num_outputs, num_slots, layers)
+
+
+def repeat_ranges(starts, counts):
+    # concatenation of range(start, start + count) for every pair
+    ends = np.cumsum(counts)
+    return np.repeat(starts - (ends - counts), counts) + np.arange(ends[-1] if len(ends) else 0)
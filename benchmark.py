@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import platform
+import pickle
+import random
+import tempfile
+import time
+
+import neat
+import numpy as np
+
+import genome_io
+import kernel
+import main
+import main_tensorflow
+from batch_net import BatchNetwork
+from simulation import Drone, DroneSwarm, EarlyStopping
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config-feedforward.txt")
+
+
+def best_time(func, repeat):
+    # best of `repeat` runs, the least disturbed by the rest of the machine
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def load_config(pop_size=None):
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                neat.DefaultSpeciesSet, neat.DefaultStagnation, CONFIG_PATH)
+    if pop_size is not None:
+        config.pop_size = pop_size
+    return config
+
+
+def create_genomes(config, count, hidden_nodes=0, seed=0):
+    random.seed(seed)
+    genomes = []
+    for key in range(count):
+        genome = config.genome_type(key)
+        genome.configure_new(config.genome_config)
+        for _ in range(hidden_nodes):
+            genome.mutate_add_node(config.genome_config)
+        genomes.append(genome)
+    return genomes
+
+
+def bench_drone_move(steps, repeat):
+    rng = random.Random(0)
+    controls = [(rng.random(), rng.random()) for _ in range(steps)]
+
+    def loop():
+        drone = Drone((main.SCREEN_WIDTH / 2, main.SCREEN_HEIGHT / 2))
+        for up, right in controls:
+            if up > 0.5:
+                drone.go_up()
+            else:
+                drone.go_down()
+            if right > 0.5:
+                drone.go_right()
+            else:
+                drone.go_left()
+            drone.move()
+
+    seconds = best_time(loop, repeat)
+    return {"benchmark": "drone_move", "params": {"steps": steps},
+            "value": steps / seconds, "unit": "drone-steps/s"}
+
+
+def bench_swarm_move(size, steps, repeat):
+    rng = np.random.default_rng(0)
+    outputs = rng.uniform(-1, 1, (steps, size, 2))
+
+    def loop():
+        swarm = DroneSwarm(size, (main.SCREEN_WIDTH / 2, main.SCREEN_HEIGHT / 2))
+        for frame_outputs in outputs:
+            swarm.control(frame_outputs)
+            swarm.move()
+
+    seconds = best_time(loop, repeat)
+    return {"benchmark": "swarm_move", "params": {"size": size, "steps": steps},
+            "value": size * steps / seconds, "unit": "drone-steps/s"}
+
+
+def bench_feed_forward(config, hidden_nodes, activations, repeat):
+    genome = create_genomes(config, 1, hidden_nodes)[0]
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    inputs = np.random.default_rng(0).normal(0, 300, (activations, 2)).tolist()
+
+    def loop():
+        for x in inputs:
+            net.activate(x)
+
+    seconds = best_time(loop, repeat)
+    return {"benchmark": "feed_forward_activate",
+            "params": {"hidden_nodes": hidden_nodes, "nodes": len(genome.nodes),
+                       "connections": len(genome.connections)},
+            "value": activations / seconds, "unit": "activations/s"}
+
+
+def bench_batch_network(config, hidden_nodes, genomes_count, calls, repeat):
+    genomes = create_genomes(config, genomes_count, hidden_nodes)
+    net = BatchNetwork.create(genomes, config)
+    inputs = np.random.default_rng(0).normal(0, 300, (calls, genomes_count, 2))
+
+    def loop():
+        for x in inputs:
+            net.activate(x)
+
+    seconds = best_time(loop, repeat)
+    return {"benchmark": "batch_network_activate",
+            "params": {"hidden_nodes": hidden_nodes, "genomes": genomes_count},
+            "value": genomes_count * calls / seconds, "unit": "activations/s"}
+
+
+def bench_generation(config, pop_size, repeat, fused=False):
+    genomes = create_genomes(config, pop_size)
+    targets = main.random_targets(1, random.Random(0))
+
+    default = main.FUSED
+    main.FUSED = fused
+    try:
+        # the kernel compiles on its first call, that is not part of the generation
+        main.simulate(genomes[:1], config, targets)
+        seconds = best_time(lambda: main.simulate(genomes, config, targets), repeat)
+    finally:
+        main.FUSED = default
+    return {"benchmark": "headless_generation", "params": {"pop_size": pop_size, "fused": fused},
+            "value": seconds, "unit": "s"}
+
+
+def check_kernel(config, pop_size=200):
+    """
+    Asserts the compiled kernel gives exactly the results of the NumPy frame loop, on seeded genomes
+    with and without hidden nodes, several targets, and with and without early stopping.
+    """
+    genomes = create_genomes(config, pop_size // 2) + create_genomes(config, pop_size - pop_size // 2, hidden_nodes=5)
+    targets = main.random_targets(3, random.Random(0))
+    default = main.FUSED
+    try:
+        for early_stopping in [None, EarlyStopping(stall_frames=30), EarlyStopping(cull_unreachable=True)]:
+            results = []
+            for fused in [False, True]:
+                main.FUSED = fused
+                results.append(main.simulate(genomes, config, targets, early_stopping=early_stopping))
+            (fitness, hit_frames), (fused_fitness, fused_hit_frames) = results
+            assert np.array_equal(fitness, fused_fitness), "kernel fitness differs from the NumPy loop"
+            assert np.array_equal(hit_frames, fused_hit_frames), "kernel hit frames differ from the NumPy loop"
+    finally:
+        main.FUSED = default
+
+
+def bench_genome_files(config, pop_size, repeat):
+    genomes = create_genomes(config, pop_size, hidden_nodes=5)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        pickle_path = os.path.join(directory, "population.pkl")
+        genome_path = os.path.join(directory, "population.genome")
+
+        def pickle_write():
+            with open(pickle_path, "wb") as f:
+                pickle.dump(genomes, f)
+
+        def pickle_read():
+            with open(pickle_path, "rb") as f:
+                pickle.load(f)
+
+        for name, func in [("pickle_write", pickle_write), ("pickle_read", pickle_read),
+                           ("genome_io_write", lambda: genome_io.save_genomes(genome_path, genomes)),
+                           ("genome_io_read_arrays", lambda: genome_io.load_arrays(genome_path)),
+                           ("genome_io_read_genomes", lambda: genome_io.load_genomes(genome_path, config))]:
+            results.append({"benchmark": name, "params": {"pop_size": pop_size},
+                            "value": best_time(func, repeat), "unit": "s"})
+    return results
+
+
+def bench_genetic_operators(pop_size, repeat):
+    rng = np.random.default_rng(0)
+    population = rng.normal(size=(pop_size, 12))
+    # negative scores, as the fitness of main_tensorflow.main goes
+    scores = rng.uniform(-10, 10, pop_size)
+
+    results = []
+    for selection in sorted(main_tensorflow.SELECTIONS):
+        def loop():
+            np.random.seed(0)
+            main_tensorflow.next_generation(population, scores, selection=selection)
+
+        results.append({"benchmark": "ga_next_generation", "params": {"pop_size": pop_size, "selection": selection},
+                        "value": best_time(loop, repeat), "unit": "s"})
+    return results
+
+
+def run(quick=False):
+    repeat = 1 if quick else 3
+    steps = 300
+    config = load_config()
+
+    results = [bench_drone_move(steps * 100, repeat)]
+    for size in ([100, 1000] if quick else [100, 1000, 10000]):
+        results.append(bench_swarm_move(size, steps, repeat))
+    for hidden_nodes in [0, 5, 20]:
+        results.append(bench_feed_forward(config, hidden_nodes, 10000, repeat))
+        results.append(bench_batch_network(config, hidden_nodes, 1000, 100, repeat))
+    if kernel.available():
+        # a kernel timing is only worth comparing if it computes the same thing
+        check_kernel(config)
+    for pop_size in ([100, 1000] if quick else [100, 1000, 10000]):
+        results.append(bench_generation(config, pop_size, repeat))
+        if kernel.available():
+            results.append(bench_generation(config, pop_size, repeat, fused=True))
+    results.extend(bench_genome_files(config, 1000 if quick else 10000, repeat))
+    for pop_size in ([1000, 100000] if quick else [1000, 100000, 1000000]):
+        results.extend(bench_genetic_operators(pop_size, repeat))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default=None, help="append the results to this JSON lines file")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes and a single repeat")
+    parser.add_argument("--check", action="store_true",
+                        help="only check the numba kernel against the NumPy frame loop and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        if not kernel.available():
+            parser.error("numba is not installed, there is no kernel to check")
+        check_kernel(load_config())
+        print("kernel matches the NumPy frame loop")
+    else:
+        metadata = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        }
+        results = run(quick=args.quick)
+        for result in results:
+            result.update(metadata)
+            print("{0:<24} {1:<60} {2:>14.3f} {3}".format(result["benchmark"], json.dumps(result["params"]),
+                                                          result["value"], result["unit"]))
+
+        if args.output is not None:
+            with open(args.output, "a") as f:
+                for result in results:
+                    f.write(json.dumps(result) + "\n")
@@ -0,0 +1,110 @@
+import gzip
+import itertools
+import os
+import pickle
+import random
+import threading
+import time
+
+import neat
+from neat.reporting import BaseReporter
+
+
+class AsyncCheckpointer(BaseReporter):
+    """
+    Saves the population, species, reproduction state, random state and the training script's
+    own state (`get_state()`) every `generation_interval` generations or `time_interval_seconds`,
+    whichever comes first. The snapshot is pickled in the training loop, then compressed and
+    written by a background thread to a temporary file that is renamed over the checkpoint.
+    """
+
+    def __init__(self, population, get_state, generation_interval=5, time_interval_seconds=300,
+                 filename_prefix="drone-checkpoint-"):
+        self.population = population
+        self.get_state = get_state
+        self.generation_interval = generation_interval
+        self.time_interval_seconds = time_interval_seconds
+        self.filename_prefix = filename_prefix
+
+        self.current_generation = None
+        self.last_generation_checkpoint = population.generation - 1
+        self.last_time_checkpoint = time.time()
+        self.writer = None
+
+    def start_generation(self, generation):
+        self.current_generation = generation
+
+    def end_generation(self, config, population, species_set):
+        checkpoint_due = False
+
+        if self.time_interval_seconds is not None:
+            if time.time() - self.last_time_checkpoint >= self.time_interval_seconds:
+                checkpoint_due = True
+
+        if not checkpoint_due and self.generation_interval is not None:
+            if self.current_generation - self.last_generation_checkpoint >= self.generation_interval:
+                checkpoint_due = True
+
+        if checkpoint_due:
+            self.save_checkpoint(config, population, species_set, self.current_generation)
+            self.last_generation_checkpoint = self.current_generation
+            self.last_time_checkpoint = time.time()
+
+    def save_checkpoint(self, config, population, species_set, generation):
+        # population is the one bred for the next generation
+        reproduction = self.population.reproduction
+        data = {
+            "generation": generation + 1,
+            "config": config,
+            "population": population,
+            "species_set": species_set,
+            "best_genome": self.population.best_genome,
+            "next_genome_key": max(population) + 1,
+            "ancestors": reproduction.ancestors,
+            "random_state": random.getstate(),
+            "state": self.get_state(),
+        }
+        # pickling here keeps the snapshot consistent, the slow part runs in the background.
+        # The species set holds the live reporters (this one included), restore links them again
+        reporters = species_set.reporters
+        species_set.reporters = None
+        try:
+            payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            species_set.reporters = reporters
+        filename = "{0}{1}".format(self.filename_prefix, generation)
+
+        self.wait()
+        self.writer = threading.Thread(target=write_checkpoint, args=(filename, payload), daemon=True)
+        self.writer.start()
+
+    def wait(self):
+        # blocks until the checkpoint being written is on disk
+        if self.writer is not None:
+            self.writer.join()
+            self.writer = None
+
+
+def write_checkpoint(filename, payload):
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "wb") as f:
+        with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=5) as gz:
+            gz.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_filename, filename)
+    print("Saved checkpoint to {0}".format(filename))
+
+
+def restore_checkpoint(filename):
+    """ Returns the population saved in the checkpoint and the training script state stored with it. """
+    with gzip.open(filename, "rb") as f:
+        data = pickle.load(f)
+
+    random.setstate(data["random_state"])
+    p = neat.Population(data["config"], (data["population"], data["species_set"], data["generation"]))
+    p.species.reporters = p.reporters
+    p.best_genome = data["best_genome"]
+    p.reproduction.genome_indexer = itertools.count(data["next_genome_key"])
+    p.reproduction.ancestors = data["ancestors"]
+    return p, data["state"]
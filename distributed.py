@@ -0,0 +1,286 @@
+import argparse
+import json
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener, answer_challenge, deliver_challenge
+
+import numpy as np
+
+
+# shared secret of the coordinator and its workers, a hex string
+AUTHKEY_ENV = "DRONE_NEAT_AUTHKEY"
+
+
+def parse_address(address):
+    # "unix:/path/to/socket" or "host:port", as multiprocessing.connection addresses
+    if address.startswith("unix:"):
+        return "AF_UNIX", address[len("unix:"):]
+    host, port = address.rsplit(":", 1)
+    return "AF_INET", (host, int(port))
+
+
+def authkey():
+    key = os.environ.get(AUTHKEY_ENV)
+    if not key:
+        raise RuntimeError("Set {0} to the key the coordinator printed".format(AUTHKEY_ENV))
+    return bytes.fromhex(key)
+
+
+def send_message(connection, message):
+    # JSON, so a peer can not make the other side run code the way a pickle could
+    connection.send_bytes(zlib.compress(json.dumps(message).encode()))
+
+
+def recv_message(connection):
+    return json.loads(zlib.decompress(connection.recv_bytes()))
+
+
+def pack_config(config):
+    # the config as the text of a neat config file, the worker parses it again
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config")
+        config.save(path)
+        with open(path) as f:
+            text = f.read()
+    types = [config.genome_type, config.reproduction_type, config.species_set_type, config.stagnation_type]
+    return [t.__name__ for t in types], text
+
+
+def unpack_config(packed):
+    import neat
+
+    type_names, text = packed
+    types = []
+    for name in type_names:
+        # only the classes neat exports by name, nothing the message names can be run
+        if name not in ["DefaultGenome", "DefaultReproduction", "DefaultSpeciesSet", "DefaultStagnation"]:
+            raise ValueError("Unsupported config type {0}".format(name))
+        types.append(getattr(neat, name))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config")
+        with open(path, "w") as f:
+            f.write(text)
+        return neat.config.Config(*types, path)
+
+
+def pack_early_stopping(early_stopping):
+    if early_stopping is None:
+        return None
+    return [early_stopping.stall_frames, early_stopping.cull_unreachable]
+
+
+def unpack_early_stopping(packed):
+    from simulation import EarlyStopping
+
+    if packed is None:
+        return None
+    return EarlyStopping(*packed)
+
+
+def pack_genome(genome):
+    # plain lists instead of the neat gene objects, JSON encodes them and is a fraction of their pickled size
+    nodes = [[key, node.bias, node.response, node.activation, node.aggregation]
+             for key, node in genome.nodes.items()]
+    connections = [[key[0], key[1], connection.weight, connection.enabled]
+                   for key, connection in genome.connections.items()]
+    return [genome.key, nodes, connections]
+
+
+def unpack_genome(packed, config):
+    key, nodes, connections = packed
+    genome_config = config.genome_config
+    genome = config.genome_type(key)
+    for node_key, bias, response, activation, aggregation in nodes:
+        node = genome_config.node_gene_type(node_key)
+        node.bias = bias
+        node.response = response
+        node.activation = activation
+        node.aggregation = aggregation
+        genome.nodes[node_key] = node
+    for in_node, out_node, weight, enabled in connections:
+        connection = genome_config.connection_gene_type((in_node, out_node))
+        connection.weight = weight
+        connection.enabled = enabled
+        genome.connections[(in_node, out_node)] = connection
+    return genome
+
+
+class DistributedEvaluator:
+    """
+    Coordinator side of distributed evaluation. Workers connect to `address`, prove they hold the
+    key in DRONE_NEAT_AUTHKEY, receive the config once, then take chunks of genomes from a shared
+    queue and send back the simulate() results. Messages are JSON, never pickles.
+    The chunk of a worker that disconnects goes back to the queue for the others.
+    evaluate gives up if no worker is connected for worker_timeout seconds while there is work left.
+    """
+
+    def __init__(self, address, config, worker_timeout=60):
+        self.address = address
+        self.config = config
+        self.worker_timeout = worker_timeout
+        self.tasks = queue.Queue()
+        self.results = {}
+        self.results_ready = threading.Condition()
+        self.handlers = []
+        self.worker_processes = []
+        self.closing = False
+
+        if not os.environ.get(AUTHKEY_ENV):
+            # a fresh key, local workers inherit it and remote ones have to be given it
+            os.environ[AUTHKEY_ENV] = secrets.token_hex(16)
+            print("Workers authenticate with {0}={1}".format(AUTHKEY_ENV, os.environ[AUTHKEY_ENV]))
+
+        family, bind_address = parse_address(address)
+        if family == "AF_UNIX" and os.path.exists(bind_address):
+            # left behind by a coordinator that did not shut down cleanly
+            os.unlink(bind_address)
+        self.authkey = authkey()
+        self.server = Listener(bind_address, family)
+        threading.Thread(target=self.accept_workers, daemon=True).start()
+
+    def accept_workers(self):
+        while not self.closing:
+            try:
+                connection = self.server.accept()
+            except OSError:
+                break
+            threading.Thread(target=self.serve_worker, args=(connection,), daemon=True).start()
+
+    def serve_worker(self, connection):
+        with connection:
+            try:
+                # the handshake Listener(authkey=...) does in accept, here a peer that stalls it only
+                # holds up its own thread. Peers without the key are dropped before anything is read
+                deliver_challenge(connection, self.authkey)
+                answer_challenge(connection, self.authkey)
+                send_message(connection, ["config", pack_config(self.config)])
+            except (OSError, EOFError, AuthenticationError):
+                return
+            # only authenticated workers count as connected and take tasks
+            self.handlers.append(threading.current_thread())
+            while True:
+                task = self.tasks.get()
+                if task is None:
+                    try:
+                        send_message(connection, ["stop"])
+                    except OSError:
+                        pass
+                    return
+                task_id, genomes, target_positions, early_stopping = task
+                try:
+                    send_message(connection, ["simulate", genomes, target_positions, early_stopping])
+                    fitness, hit_frames, phase_times = recv_message(connection)
+                except (OSError, EOFError, ValueError, zlib.error):
+                    # the worker is gone, another one takes its chunk
+                    self.tasks.put(task)
+                    return
+                with self.results_ready:
+                    self.results[task_id] = (np.array(fitness, dtype=np.float64),
+                                             np.array(hit_frames, dtype=np.int64), phase_times)
+                    self.results_ready.notify_all()
+
+    def connected_workers(self):
+        return sum(handler.is_alive() for handler in self.handlers)
+
+    def evaluate(self, genomes, target_positions, early_stopping=None):
+        """ Same results as main.simulate on all genomes, computed by the connected workers. """
+        # a few chunks per worker, so a slow or lost worker holds up little of the generation
+        workers = max(1, self.connected_workers(), len(self.worker_processes))
+        chunk_count = max(1, min(len(genomes), 4 * workers))
+        chunks = [list(chunk) for chunk in np.array_split(np.array(genomes, dtype=object), chunk_count)]
+        task_ids = []
+        with self.results_ready:
+            self.results.clear()
+        for task_id, chunk in enumerate(chunks):
+            self.tasks.put((task_id, [pack_genome(g) for g in chunk], [list(pos) for pos in target_positions],
+                            pack_early_stopping(early_stopping)))
+            task_ids.append(task_id)
+
+        last_connected = time.time()
+        with self.results_ready:
+            while len(self.results) < len(task_ids):
+                self.results_ready.wait(timeout=1)
+                if self.connected_workers() > 0:
+                    last_connected = time.time()
+                elif time.time() - last_connected > self.worker_timeout:
+                    raise RuntimeError("No worker connected for {0} seconds, start workers with "
+                                       "'python distributed.py worker --connect {1}' and the key of "
+                                       "this run in {2}".format(self.worker_timeout, self.address, AUTHKEY_ENV))
+            results = [self.results[task_id] for task_id in task_ids]
+
+        fitness = np.concatenate([chunk_fitness for chunk_fitness, _, _ in results])
+        hit_frames = np.concatenate([chunk_hit_frames for _, chunk_hit_frames, _ in results], axis=1)
+        phase_times = {}
+        for _, _, chunk_phase_times in results:
+            for phase, seconds in chunk_phase_times.items():
+                phase_times[phase] = phase_times.get(phase, 0.0) + seconds
+        return fitness, hit_frames, phase_times
+
+    def spawn_local_workers(self, count):
+        # worker processes on this machine, handy for testing the whole protocol on one host
+        for _ in range(count):
+            self.worker_processes.append(subprocess.Popen(
+                [sys.executable, __file__, "worker", "--connect", self.address]))
+
+    def close(self):
+        self.closing = True
+        for _ in self.handlers:
+            self.tasks.put(None)
+        self.server.close()
+        family, bind_address = parse_address(self.address)
+        if family == "AF_UNIX" and os.path.exists(bind_address):
+            os.unlink(bind_address)
+        for process in self.worker_processes:
+            process.wait()
+
+
+def connect(address, retry_seconds=30):
+    family, connect_address = parse_address(address)
+    deadline = time.time() + retry_seconds
+    while True:
+        try:
+            return Client(connect_address, family, authkey=authkey())
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.5)
+
+
+def run_worker(address):
+    # imported here, main imports this module for the coordinator side
+    import main
+
+    with connect(address) as connection:
+        _, packed_config = recv_message(connection)
+        config = unpack_config(packed_config)
+        while True:
+            try:
+                message = recv_message(connection)
+            except (EOFError, OSError):
+                return
+            if message[0] == "stop":
+                return
+            _, packed_genomes, target_positions, early_stopping = message
+            genomes = [unpack_genome(packed, config) for packed in packed_genomes]
+            fitness, hit_frames, phase_times = main.simulate_chunk(
+                (genomes, config, [tuple(pos) for pos in target_positions], unpack_early_stopping(early_stopping)))
+            send_message(connection, [fitness.tolist(), hit_frames.tolist(), phase_times])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", choices=["worker"])
+    parser.add_argument("--connect", required=True,
+                        help="coordinator address, host:port or unix:/path, with the coordinator's key in "
+                             + AUTHKEY_ENV)
+    args = parser.parse_args()
+
+    run_worker(args.connect)
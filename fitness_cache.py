@@ -0,0 +1,56 @@
+import hashlib
+from collections import OrderedDict
+
+
+def genome_key(genome):
+    """ Hash of everything that changes a neat genome's network: nodes, connections, weights and enabled flags. """
+    h = hashlib.sha1()
+    for key in sorted(genome.nodes):
+        node = genome.nodes[key]
+        h.update(repr((key, node.bias, node.response, node.activation, node.aggregation)).encode())
+    h.update(b"|")
+    for key in sorted(genome.connections):
+        connection = genome.connections[key]
+        h.update(repr((key, connection.weight, connection.enabled)).encode())
+    return h.hexdigest()
+
+
+def array_key(genome):
+    """ Hash of a flat weight array genome, as used by main_tensorflow.py. """
+    return hashlib.sha1(genome.tobytes()).hexdigest()
+
+
+class FitnessCache:
+    """
+    LRU cache of episode results keyed by (genome hash, episode key). Only valid for
+    deterministic episodes, the episode key has to describe everything else the result depends on.
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def reset_counters(self):
+        hits, misses = self.hits, self.misses
+        self.hits = 0
+        self.misses = 0
+        return hits, misses
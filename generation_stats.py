@@ -0,0 +1,110 @@
+import argparse
+import csv
+import io
+import os
+import time
+
+import numpy as np
+from neat.reporting import BaseReporter
+
+COLUMNS = ["generation", "genomes", "episodes", "successes", "first_hit_time", "fitness_min", "fitness_p25",
+           "fitness_median", "fitness_p75", "fitness_max", "fitness_mean", "species", "evaluation_time"]
+
+
+class GenerationStatsReporter(BaseReporter):
+    """
+    Appends one CSV row per generation: how many episodes reached their target, the earliest hit
+    in seconds (empty if none did), fitness percentiles, species count and evaluation time.
+    Only the running generation's counters are kept in memory. Every row is written with a single
+    append, so the file can be read while training runs.
+    The fitness function reports the hit frames of its episodes with add_hits, in any number of calls.
+    resume_generation is the generation of the checkpoint a resumed run continues from, None for a fresh run.
+    """
+
+    def __init__(self, path, fps, resume_generation=None):
+        self.path = path
+        self.fps = fps
+        self.generation = None
+        self.generation_start_time = None
+        self.episodes = 0
+        self.successes = 0
+        self.first_hit_frame = None
+
+        if resume_generation is not None and os.path.exists(path):
+            # a run resumed from a checkpoint keeps the rows before it and evaluates the rest again
+            trim(path, resume_generation)
+        else:
+            # a fresh run starts a new file, rows of an earlier run would repeat its generation numbers
+            with open(path, "w", newline="") as f:
+                csv.writer(f).writerow(COLUMNS)
+
+    def add_hits(self, hit_frames):
+        hit_frames = np.asarray(hit_frames)
+        collided = hit_frames >= 0
+        self.episodes += hit_frames.size
+        self.successes += int(collided.sum())
+        if collided.any():
+            first = int(hit_frames[collided].min())
+            if self.first_hit_frame is None or first < self.first_hit_frame:
+                self.first_hit_frame = first
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.generation_start_time = time.perf_counter()
+        self.episodes = 0
+        self.successes = 0
+        self.first_hit_frame = None
+
+    def post_evaluate(self, config, population, species, best_genome):
+        # written here rather than in end_generation, a solved run stops before that
+        fitness = np.array([g.fitness for g in population.values()], dtype=np.float64)
+        p25, median, p75 = np.percentile(fitness, [25, 50, 75])
+        row = [self.generation, len(population), self.episodes, self.successes,
+               "" if self.first_hit_frame is None else self.first_hit_frame / self.fps,
+               fitness.min(), p25, median, p75, fitness.max(), fitness.mean(),
+               len(species.species), time.perf_counter() - self.generation_start_time]
+        line = io.StringIO()
+        csv.writer(line).writerow(row)
+        with open(self.path, "a", newline="") as f:
+            f.write(line.getvalue())
+
+
+def trim(path, generation):
+    """ Drops the rows from `generation` on, the rest of the file is replaced in one rename. """
+    with open(path, newline="") as f:
+        rows = [row for row in csv.reader(f)]
+    kept = [rows[0]] + [row for row in rows[1:] if row and int(row[0]) < generation]
+    if len(kept) == len(rows):
+        return
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="") as f:
+        csv.writer(f).writerows(kept)
+    os.replace(tmp_path, path)
+
+
+def load_stats(path):
+    """ The columns of a stats file as float arrays, an empty first hit time as NaN. """
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        rows = [row for row in reader]
+    return {column: np.array([float(row[column]) if row[column] else np.nan for row in rows])
+            for column in COLUMNS}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="plot a statistics file written by main.py")
+    parser.add_argument("stats", nargs="?", default="generation-stats.csv")
+    parser.add_argument("--show", action="store_true", help="open the plots as well as saving them")
+    args = parser.parse_args()
+
+    import matplotlib.pyplot as plt
+
+    stats = load_stats(args.stats)
+    for column, label in [("successes", "SUCCESFULL GENOMES"), ("first_hit_time", "BEST TIMES")]:
+        plt.figure()
+        plt.xlabel("GENERATIONS")
+        plt.ylabel(label)
+        plt.plot(stats["generation"], stats[column])
+        plt.savefig("GENERATIONS vs {0}".format(label))
+    if args.show:
+        plt.show()
@@ -0,0 +1,145 @@
+import mmap
+import struct
+
+import numpy as np
+
+# file layout, all little endian:
+#   header      magic, version, reserved, genome count, node count, connection count, names length
+#   names       activation and aggregation function names, utf-8, separated by newlines
+#   arrays      the ARRAYS below in order, each padded to 8 bytes, genome i owns
+#               nodes node_offsets[i]:node_offsets[i + 1] and the connections likewise
+MAGIC = b"DRGN"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQQI")
+
+ARRAYS = [
+    ("key", "<i8", "genomes"),
+    ("fitness", "<f8", "genomes"),
+    ("node_offsets", "<i8", "genomes + 1"),
+    ("connection_offsets", "<i8", "genomes + 1"),
+    ("node_id", "<i8", "nodes"),
+    ("bias", "<f8", "nodes"),
+    ("response", "<f8", "nodes"),
+    ("activation", "<u2", "nodes"),
+    ("aggregation", "<u2", "nodes"),
+    ("in_node", "<i8", "connections"),
+    ("out_node", "<i8", "connections"),
+    ("weight", "<f8", "connections"),
+    ("enabled", "<u1", "connections"),
+]
+
+
+def padding(size):
+    return -size % 8
+
+
+class GenomeArrays:
+    """
+    A population as flat arrays, see the layout above. Loaded with mmap=True the arrays
+    are views of the file and only the pages that are read get loaded.
+    """
+
+    def __init__(self, names, arrays):
+        self.names = names
+        for name, array in arrays.items():
+            setattr(self, name, array)
+
+    def __len__(self):
+        return len(self.key)
+
+    def genome(self, i, config):
+        """ Rebuilds genome i as a neat genome of config.genome_type, with the gene types of its genome config. """
+        genome_config = config.genome_config
+        genome = config.genome_type(int(self.key[i]))
+        if not np.isnan(self.fitness[i]):
+            genome.fitness = float(self.fitness[i])
+        for n in range(self.node_offsets[i], self.node_offsets[i + 1]):
+            node = genome_config.node_gene_type(int(self.node_id[n]))
+            node.bias = float(self.bias[n])
+            node.response = float(self.response[n])
+            node.activation = self.names[self.activation[n]]
+            node.aggregation = self.names[self.aggregation[n]]
+            genome.nodes[node.key] = node
+        for c in range(self.connection_offsets[i], self.connection_offsets[i + 1]):
+            key = (int(self.in_node[c]), int(self.out_node[c]))
+            connection = genome_config.connection_gene_type(key)
+            connection.weight = float(self.weight[c])
+            connection.enabled = bool(self.enabled[c])
+            genome.connections[key] = connection
+        return genome
+
+
+def to_arrays(genomes):
+    names = sorted({n.activation for g in genomes for n in g.nodes.values()} |
+                   {n.aggregation for g in genomes for n in g.nodes.values()})
+    name_index = {name: i for i, name in enumerate(names)}
+    nodes = [n for g in genomes for n in g.nodes.values()]
+    connections = [c for g in genomes for c in g.connections.values()]
+
+    arrays = {
+        "key": np.array([g.key for g in genomes], dtype="<i8"),
+        "fitness": np.array([np.nan if g.fitness is None else g.fitness for g in genomes], dtype="<f8"),
+        "node_offsets": np.cumsum([0] + [len(g.nodes) for g in genomes], dtype="<i8"),
+        "connection_offsets": np.cumsum([0] + [len(g.connections) for g in genomes], dtype="<i8"),
+        "node_id": np.array([n.key for n in nodes], dtype="<i8"),
+        "bias": np.array([n.bias for n in nodes], dtype="<f8"),
+        "response": np.array([n.response for n in nodes], dtype="<f8"),
+        "activation": np.array([name_index[n.activation] for n in nodes], dtype="<u2"),
+        "aggregation": np.array([name_index[n.aggregation] for n in nodes], dtype="<u2"),
+        "in_node": np.array([c.key[0] for c in connections], dtype="<i8"),
+        "out_node": np.array([c.key[1] for c in connections], dtype="<i8"),
+        "weight": np.array([c.weight for c in connections], dtype="<f8"),
+        "enabled": np.array([c.enabled for c in connections], dtype="<u1"),
+    }
+    return GenomeArrays(names, arrays)
+
+
+def save_genomes(path, genomes):
+    """ Writes a list of neat genomes, a winner is a list of one. """
+    arrays = to_arrays(genomes)
+    names = "\n".join(arrays.names).encode()
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(arrays), len(arrays.node_id), len(arrays.in_node), len(names)))
+        f.write(names + b"\0" * padding(HEADER.size + len(names)))
+        for name, _, _ in ARRAYS:
+            data = getattr(arrays, name).tobytes()
+            f.write(data + b"\0" * padding(len(data)))
+
+
+def load_arrays(path, mmap_mode=True):
+    """ Reads a file written by save_genomes as a GenomeArrays, without building any neat objects. """
+    with open(path, "rb") as f:
+        if mmap_mode:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = f.read()
+
+    magic, version, _, genomes, nodes, connections, names_length = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("{0} is not a genome file".format(path))
+    if version != VERSION:
+        raise ValueError("Unsupported genome file version {0} in {1}".format(version, path))
+    offset = HEADER.size
+    names = bytes(buffer[offset:offset + names_length]).decode().split("\n") if names_length else []
+    offset += names_length + padding(offset + names_length)
+
+    sizes = {"genomes": genomes, "genomes + 1": genomes + 1, "nodes": nodes, "connections": connections}
+    arrays = {}
+    for name, dtype, size in ARRAYS:
+        count = sizes[size]
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        offset += arrays[name].nbytes + padding(arrays[name].nbytes)
+    return GenomeArrays(names, arrays)
+
+
+def load_genomes(path, config):
+    arrays = load_arrays(path)
+    return [arrays.genome(i, config) for i in range(len(arrays))]
+
+
+def save_winner(path, genome):
+    save_genomes(path, [genome])
+
+
+def load_winner(path, config):
+    return load_arrays(path).genome(0, config)
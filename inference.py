@@ -0,0 +1,146 @@
+import argparse
+import math
+import os
+
+import numpy as np
+
+# vectorized versions of the neat.activations functions
+ACTIVATIONS = {
+    "tanh": lambda z: np.tanh(np.clip(2.5 * z, -60.0, 60.0)),
+    "sigmoid": lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    "relu": lambda z: np.maximum(z, 0.0),
+    "identity": lambda z: z,
+}
+
+# scalar versions for the single network path, the same functions as neat.activations
+SCALAR_ACTIVATIONS = {
+    "tanh": lambda z: math.tanh(max(-60.0, min(60.0, 2.5 * z))),
+    "sigmoid": lambda z: 1.0 / (1.0 + math.exp(-max(-60.0, min(60.0, 5.0 * z)))),
+    "relu": lambda z: z if z > 0.0 else 0.0,
+    "identity": lambda z: z,
+}
+
+ARTIFACT_VERSION = 1
+
+
+class CompiledNetwork:
+    """
+    A single feed forward network frozen into NumPy arrays: inputs in the first slots, outputs in
+    the next ones, then the nodes of every layer with a dense weight row each, in evaluation order.
+    Needs nothing but NumPy, so a saved artifact replays without neat, the config file or the genome.
+    """
+
+    def __init__(self, num_inputs, num_outputs, num_slots, layers):
+        self.num_inputs = num_inputs
+        self.num_outputs = num_outputs
+        self.num_slots = num_slots
+        # (nodes, weights, bias, response, activation name of every node)
+        self.layers = layers
+        # the arrays flattened into one list of node evaluations, for a network this small plain floats
+        # are several times faster than a NumPy call per layer
+        self.plan = []
+        for nodes, weights, bias, response, activations in layers:
+            for i, slot in enumerate(nodes):
+                sources = np.flatnonzero(weights[i])
+                self.plan.append((int(slot), float(bias[i]), float(response[i]), SCALAR_ACTIVATIONS[activations[i]],
+                                  [(int(source), float(weights[i, source])) for source in sources]))
+        self.output_slots = range(num_inputs, num_inputs + num_outputs)
+
+    def activate(self, inputs):
+        """ Same outputs as neat.nn.FeedForwardNetwork.activate, up to the summation order. """
+        values = [0.0] * self.num_slots
+        values[:self.num_inputs] = inputs
+        for slot, bias, response, activation, links in self.plan:
+            s = 0.0
+            for source, weight in links:
+                s += values[source] * weight
+            values[slot] = activation(bias + response * s)
+        return [values[slot] for slot in self.output_slots]
+
+    def save(self, path):
+        arrays = {"version": np.array(ARTIFACT_VERSION),
+                  "shape": np.array([self.num_inputs, self.num_outputs, self.num_slots])}
+        for i, (nodes, weights, bias, response, activations) in enumerate(self.layers):
+            arrays["layer{0}_nodes".format(i)] = nodes
+            arrays["layer{0}_weights".format(i)] = weights
+            arrays["layer{0}_bias".format(i)] = bias
+            arrays["layer{0}_response".format(i)] = response
+            arrays["layer{0}_activations".format(i)] = activations
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @staticmethod
+    def load(path):
+        with np.load(path) as artifact:
+            if int(artifact["version"]) != ARTIFACT_VERSION:
+                raise ValueError("Unsupported inference artifact version {0} in {1}".format(
+                    int(artifact["version"]), path))
+            num_inputs, num_outputs, num_slots = (int(n) for n in artifact["shape"])
+            layers = []
+            while "layer{0}_nodes".format(len(layers)) in artifact:
+                prefix = "layer{0}_".format(len(layers))
+                layers.append(tuple(artifact[prefix + name]
+                                    for name in ["nodes", "weights", "bias", "response", "activations"]))
+        for _, _, _, _, activations in layers:
+            for name in activations:
+                if name not in SCALAR_ACTIVATIONS:
+                    raise ValueError("Unsupported activation function: {0}".format(name))
+        return CompiledNetwork(num_inputs, num_outputs, num_slots, layers)
+
+    @staticmethod
+    def create(genome, config):
+        """ Compiles a neat genome, the evaluation order is the one FeedForwardNetwork.create picks. """
+        # neat is only needed to compile, not to run the artifact
+        from neat.graphs import feed_forward_layers
+
+        input_keys = config.genome_config.input_keys
+        output_keys = config.genome_config.output_keys
+        connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+        node_layers = feed_forward_layers(input_keys, output_keys, connections)
+
+        slots = {key: i for i, key in enumerate(input_keys + output_keys)}
+        for layer in node_layers:
+            for node in sorted(layer):
+                if node not in slots:
+                    slots[node] = len(slots)
+
+        layers = []
+        for layer in node_layers:
+            nodes = sorted(layer)
+            rows = {node: i for i, node in enumerate(nodes)}
+            weights = np.zeros((len(nodes), len(slots)))
+            for inode, onode in connections:
+                if onode in rows:
+                    weights[rows[onode], slots[inode]] += genome.connections[(inode, onode)].weight
+            for node in nodes:
+                ng = genome.nodes[node]
+                if ng.aggregation != "sum":
+                    raise ValueError("Unsupported aggregation function: {0}".format(ng.aggregation))
+                if ng.activation not in SCALAR_ACTIVATIONS:
+                    raise ValueError("Unsupported activation function: {0}".format(ng.activation))
+            layers.append((np.array([slots[node] for node in nodes]), weights,
+                           np.array([genome.nodes[node].bias for node in nodes]),
+                           np.array([genome.nodes[node].response for node in nodes]),
+                           np.array([genome.nodes[node].activation for node in nodes])))
+
+        return CompiledNetwork(len(input_keys), len(output_keys), len(slots), layers)
+
+
+def export_network(genome, config, path):
+    CompiledNetwork.create(genome, config).save(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="compile a saved winner into an inference artifact")
+    parser.add_argument("--genome", default="winner.genome", help="genome_io file of the winner")
+    parser.add_argument("--output", default="winner.npz")
+    args = parser.parse_args()
+
+    import neat
+    from genome_io import load_winner
+
+    config_path = os.path.join(os.path.dirname(__file__), "config-feedforward.txt")
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                neat.DefaultSpeciesSet, neat.DefaultStagnation, config_path)
+    export_network(load_winner(args.genome, config), config, args.output)
+    print("Saved {0}".format(args.output))
@@ -0,0 +1,217 @@
+import importlib.util
+import math
+
+import numpy as np
+
+# the inference.ACTIVATIONS functions by their index in the kernel
+ACTIVATION_CODES = {"tanh": 0, "sigmoid": 1, "relu": 2, "identity": 3}
+
+
+def network_program(net):
+    """
+    Flattens a BatchNetwork into the node evaluations of every genome, genome i owns evaluations
+    eval_offsets[i]:eval_offsets[i + 1]. The evaluations and their links keep the order
+    BatchNetwork.activate sums them in.
+    """
+    num_slots = net.num_slots
+    # an empty first entry keeps a network without layers concatenating
+    columns = {name: [np.zeros(0, dtype=np.int64)]
+               for name in ["genome", "slot", "activation", "link_start", "link_end", "link_source"]}
+    columns.update({name: [np.zeros(0)] for name in ["bias", "response", "link_weight"]})
+    link_offset = 0
+    for nodes, bias, response, activations, sources, weights, starts, unconnected in net.layers:
+        codes = np.empty(len(nodes), dtype=np.int64)
+        for name, selection in activations:
+            codes[selection] = ACTIVATION_CODES[name]
+        ends = np.append(starts[1:], len(sources))
+        ends[unconnected] = starts[unconnected]
+        columns["genome"].append(nodes // num_slots)
+        columns["slot"].append(nodes % num_slots)
+        columns["bias"].append(bias)
+        columns["response"].append(response)
+        columns["activation"].append(codes)
+        columns["link_start"].append(starts + link_offset)
+        columns["link_end"].append(ends + link_offset)
+        columns["link_source"].append(sources % num_slots)
+        columns["link_weight"].append(weights)
+        link_offset += len(sources)
+
+    program = {name: np.concatenate(values) for name, values in columns.items()}
+    # the layers were concatenated in depth order, a stable sort keeps it within every genome
+    genome = program.pop("genome")
+    order = np.argsort(genome, kind="stable")
+    for name in ["slot", "bias", "response", "activation", "link_start", "link_end"]:
+        program[name] = program[name][order]
+    genome_counts = np.bincount(genome, minlength=net.num_genomes)
+    program["eval_offsets"] = np.concatenate(([0], np.cumsum(genome_counts))).astype(np.int64)
+    return program
+
+
+def simulate_drones(x0, y0, target_x, target_y, drone_genome, eval_offsets, slot, bias, response, activation,
+                    link_start, link_end, link_source, link_weight, num_slots, num_inputs,
+                    gravity, drag, y_vel_boundary, x_vel_boundary, y_drag, img_width, img_height,
+                    screen_width, screen_height, time_limit, stall_frames, cull_unreachable, fitness, hit_frames):
+    """
+    The frame loop of main.simulate fused into one pass per drone: network, controls, DroneSwarm.move,
+    screen bounds, target distance, fitness and EarlyStopping, with no temporary arrays. Drones do not
+    interact, so each one is flown to the end before the next. x_vel_boundary is inf for no cap,
+    stall_frames -1 for no stall culling. Writes fitness and hit_frames, both indexed by drone.
+    """
+    values = np.zeros(num_slots)
+    for drone in range(len(target_x)):
+        genome = drone_genome[drone]
+        tx = target_x[drone]
+        ty = target_y[drone]
+        x = x0
+        y = y0
+        x_vel = 0.0
+        y_vel = 0.0
+        rotation = 0.0
+        # DroneSwarm.cargo_center
+        old_distance = math.hypot(tx - (math.trunc(x + img_width / 2 - 5) + 5),
+                                  ty - (math.trunc(y + img_height / 2 + 6) + 5))
+        best_distance = old_distance
+        stalled = 0
+        drone_fitness = 0.0
+        # slots the genome never evaluates read as 0, as in BatchNetwork.activate
+        values[:] = 0.0
+
+        for frame in range(1, time_limit):
+            values[0] = math.trunc(x + img_width / 2 - 5) + 5 - tx
+            values[1] = math.trunc(y + img_height / 2 + 6) + 5 - ty
+            for e in range(eval_offsets[genome], eval_offsets[genome + 1]):
+                s = 0.0
+                for link in range(link_start[e], link_end[e]):
+                    s += values[link_source[link]] * link_weight[link]
+                z = bias[e] + response[e] * s
+                if activation[e] == 0:
+                    value = math.tanh(min(max(2.5 * z, -60.0), 60.0))
+                elif activation[e] == 1:
+                    value = 1.0 / (1.0 + math.exp(-min(max(5.0 * z, -60.0), 60.0)))
+                elif activation[e] == 2:
+                    value = max(z, 0.0)
+                else:
+                    value = z
+                values[slot[e]] = value
+            up_down = values[num_inputs]
+            right_left = values[num_inputs + 1]
+
+            # DroneSwarm.control and move
+            y_acc = 0.0
+            x_acc = 0.0
+            if up_down > 0.5:
+                y_acc = -1.0
+            if up_down < -0.5:
+                y_acc = 1.0
+            if right_left > 0.5:
+                x_acc = 1.0
+                rotation -= 5.0
+            if right_left < -0.5:
+                x_acc = -1.0
+                rotation += 5.0
+            y_vel += y_acc + gravity
+            y_vel = min(max(y_vel, -y_vel_boundary), y_vel_boundary)
+            if y_drag:
+                if y_vel > 0:
+                    y_vel -= drag
+                elif y_vel < 0:
+                    y_vel += drag
+            y += y_vel
+            x_vel += x_acc
+            if x_vel > 0:
+                x_vel -= drag
+            elif x_vel < 0:
+                x_vel += drag
+            x_vel = min(max(x_vel, -x_vel_boundary), x_vel_boundary)
+            x += x_vel
+            rotation = min(max(rotation, -30.0), 30.0)
+            if rotation > 0:
+                rotation -= 2.0
+            elif rotation < 0:
+                rotation += 2.0
+
+            # the fitness of main.simulate
+            resolved = False
+            if x > screen_width + 50 or x < -50 or y > screen_height + 50 or y < -50:
+                resolved = True
+                drone_fitness -= 1
+            distance = math.hypot(tx - (math.trunc(x + img_width / 2 - 5) + 5),
+                                  ty - (math.trunc(y + img_height / 2 + 6) + 5))
+            if distance < 5:
+                resolved = True
+                hit_frames[drone] = frame
+                drone_fitness += 10
+            if old_distance < distance:
+                drone_fitness -= 0.1
+            elif old_distance > distance:
+                drone_fitness += 0.1
+            old_distance = distance
+            drone_fitness -= 0.1
+
+            # EarlyStopping.cull
+            frames_left = time_limit - 1 - frame
+            culled = False
+            if stall_frames >= 0:
+                if distance < best_distance:
+                    best_distance = distance
+                    stalled = 0
+                else:
+                    stalled += 1
+                culled = stalled >= stall_frames
+            if cull_unreachable:
+                reach = math.hypot(frames_left * x_vel_boundary + 1, frames_left * y_vel_boundary + 1)
+                culled = culled or distance >= 5 + reach
+            if culled and not resolved:
+                resolved = True
+                drone_fitness -= 0.1 * frames_left
+
+            if resolved:
+                break
+        fitness[drone] = drone_fitness
+
+
+# simulate_drones compiled by numba, built by compiled_simulate_drones on first use
+FUSED_SIMULATE_DRONES = None
+
+
+def available():
+    # numba is optional, without it main.simulate keeps to the NumPy path. Only looked up here,
+    # importing numba takes longer than everything else main imports
+    return importlib.util.find_spec("numba") is not None
+
+
+def compiled_simulate_drones():
+    global FUSED_SIMULATE_DRONES
+    if FUSED_SIMULATE_DRONES is None:
+        from numba import njit
+        # the compiled code is cached next to this file
+        FUSED_SIMULATE_DRONES = njit(cache=True)(simulate_drones)
+    return FUSED_SIMULATE_DRONES
+
+
+def simulate(net, drone_genome, x0, y0, target_x, target_y, params, time_limit, early_stopping=None):
+    """
+    Flies every drone from (x0, y0) with the compiled kernel, drone i with genome drone_genome[i] of net.
+    Returns the fitness and hit frame of every drone.
+    """
+    program = network_program(net)
+    fitness = np.zeros(len(target_x))
+    hit_frames = np.full(len(target_x), -1, dtype=np.int64)
+    stall_frames = -1
+    cull_unreachable = False
+    if early_stopping is not None:
+        if early_stopping.stall_frames is not None:
+            stall_frames = early_stopping.stall_frames
+        cull_unreachable = early_stopping.cull_unreachable
+    x_vel_boundary = np.inf if params.x_vel_boundary is None else params.x_vel_boundary
+
+    compiled_simulate_drones()(float(x0), float(y0), np.asarray(target_x, dtype=np.float64),
+                               np.asarray(target_y, dtype=np.float64), np.asarray(drone_genome, dtype=np.int64),
+                               program["eval_offsets"], program["slot"], program["bias"], program["response"],
+                               program["activation"], program["link_start"], program["link_end"],
+                               program["link_source"], program["link_weight"], net.num_slots, net.num_inputs,
+                               float(params.gravity), float(params.drag), float(params.y_vel_boundary),
+                               float(x_vel_boundary), bool(params.y_drag), float(params.img_width),
+                               float(params.img_height), float(params.screen_width), float(params.screen_height),
+                               time_limit, stall_frames, cull_unreachable, fitness, hit_frames)
+    return fitness, hit_frames
@@ -1,286 +1,430 @@
-import pygame
 import random
 import neat
-from math import hypot
 import os
-import pickle
+import argparse
+import multiprocessing
 import numpy as np
-import matplotlib.pyplot as plt
-
-SCREEN_WIDTH = 1200
-SCREEN_HEIGHT = 700
+from simulation import DroneSwarm, EarlyStopping, Target, NEAT_PHYSICS, random_target
+from batch_net import BatchNetwork
+from checkpoint import AsyncCheckpointer, restore_checkpoint
+from profiling import PhaseTimer, ProfileReporter
+from fitness_cache import FitnessCache, genome_key
+from distributed import DistributedEvaluator
+from steady_state import SteadyStateEvolution
+from genome_io import save_winner
+from inference import export_network
+from trajectory import Episode, TrajectoryRecorder
+from generation_stats import GenerationStatsReporter
+import kernel
+
+PHYSICS = NEAT_PHYSICS
+SCREEN_WIDTH = PHYSICS.screen_width
+SCREEN_HEIGHT = PHYSICS.screen_height
 FPS = 30
 
-PLAYER_IMG = pygame.image.load("assets/drone.png")
-PLAYER_IMG_HEIGHT = PLAYER_IMG.get_height()
-PLAYER_IMG_WIDTH = PLAYER_IMG.get_width()
-
-GRAVITY = 0
-DRAG = 0.5
-
-# Initialize pygame
-pygame.init()
-pygame.font.init()
-myfont = pygame.font.SysFont('Comic Sans MS', 30)
-
-
-# Player
-class Drone:
-
-    def __init__(self, pos=(340, 200)):
-        self.img = PLAYER_IMG
-        # coordinates
-        self.x = pos[0]
-        self.y = pos[1]
-        # velocity
-        self.y_vel = 0
-        self.x_vel = 0
-        # velocity boundaries
-        self.y_vel_up_boundary = -5
-        self.y_vel_down_boundary = 5
-        # acceleration
-        self.y_acc = 0
-        self.x_acc = 0
-        # rotation
-        self.rotation_angle = 0
-        self.old_distance = 0
-        self.old_x = pos[0]
-        self.best_distance = 9999
-
-        self.cargo_rect = pygame.Rect(self.x + (PLAYER_IMG_WIDTH / 2) - 5, self.y + (PLAYER_IMG_HEIGHT / 2) + 6, 10, 10)
-
-        self.is_collided = False
-        self.is_dead = False
-
-    def go_up(self):
-        self.y_acc = -1
-
-    def go_down(self):
-        self.y_acc = 1
-
-    def go_right(self):
-        self.x_acc = 1
-        self.rotation_angle += -5
-
-    def go_left(self):
-        self.x_acc = -1
-        self.rotation_angle += 5
-
-    def move(self):
-        # y movement
-        self.y_vel += self.y_acc + GRAVITY
-        if self.y_vel < self.y_vel_up_boundary:
-            self.y_vel = self.y_vel_up_boundary
-        elif self.y_vel > self.y_vel_down_boundary:
-            self.y_vel = self.y_vel_down_boundary
-        if self.y_vel > 0:
-            self.y_vel -= DRAG
-        elif self.y_vel < 0:
-            self.y_vel += DRAG
-        self.y += self.y_vel
-        self.y_acc = 0
-        # x movement
-        self.x_vel += self.x_acc
-        if self.x_vel > 0:
-            self.x_vel -= DRAG
-        elif self.x_vel < 0:
-            self.x_vel += DRAG
-        if self.x_vel > 10:
-            self.x_vel = 10
-        elif self.x_vel < -10:
-            self.x_vel = -10
-        self.x += self.x_vel
-        self.x_acc = 0
-        # rotation
-        if self.rotation_angle > 30:
-            self.rotation_angle = 30
-        elif self.rotation_angle < -30:
-            self.rotation_angle = -30
-        if self.rotation_angle > 0:
-            self.rotation_angle -= 2
-        elif self.rotation_angle < 0:
-            self.rotation_angle += 2
-
-    def draw(self, screen):
-        self.cargo_rect = pygame.Rect(self.x + (PLAYER_IMG_WIDTH / 2) - 5, self.y + (PLAYER_IMG_HEIGHT / 2) + 6, 10, 10)
-        rotated_img = pygame.transform.rotate(self.img, self.rotation_angle)
-        new_rect = rotated_img.get_rect(
-            center=self.img.get_rect(topleft=(self.x, self.y)).center)
-        screen.blit(rotated_img, new_rect.topleft)
-
-    def draw_rectangles(self, screen):
-        cargo_rect = pygame.Rect(self.x + (PLAYER_IMG_WIDTH / 2) - 5, self.y + (PLAYER_IMG_HEIGHT / 2) + 6, 10, 10)
-        pygame.draw.rect(screen, (255, 0, 0), pygame.Rect(self.x, self.y, PLAYER_IMG_WIDTH, PLAYER_IMG_HEIGHT))
-        pygame.draw.rect(screen, (0, 255, 0), cargo_rect)
-
-    def draw_line_to_target(self, screen, target):
-        pygame.draw.line(screen, (0, 0, 255), self.cargo_rect.center, target.center())
-
-    def distance_to_target(self, target):
-        return hypot(target.center()[0] - self.cargo_rect.center[0], target.center()[1] - self.cargo_rect.center[1])
-
-
-class Target:
-
-    def __init__(self):
-        self.x = random.randint(30, SCREEN_WIDTH - 30)
-        self.y = random.randint(30, SCREEN_HEIGHT - 30)
-        self.width = 5
-        self.color = (0, 255, 0)
-
-    def draw(self, screen):
-        pygame.draw.circle(screen, self.color, (self.x, self.y), self.width)
-
-    def center(self):
-        return self.x + (self.width / 2), self.y + (self.width / 2)
-
-
-def draw_screen(screen, drones, target, successfull, generation):
-    screen.fill((0, 0, 0))
-    for drone in drones:
-        drone.draw_rectangles(screen=screen)
-        drone.draw_line_to_target(screen=screen, target=target)
-        drone.draw(screen=screen)
-
-    target.draw(screen=screen)
-
-    textsurface = myfont.render(f'Success: {successfull}', False, (255, 255, 255))
-    screen.blit(textsurface, (0, 0))
-
-    textsurface = myfont.render(f'GEN: {generation}', False, (255, 255, 255))
-    screen.blit(textsurface, (0, 20))
-
-
-GEN = 0
-SUCCESS_NUMBERS = []
-MAX_TIMES = []
-
 
-def main(genomes, config):
-    clock = pygame.time.Clock()
+def random_targets(count, rng=random):
+    return [random_target(PHYSICS, rng=rng) for _ in range(count)]
 
-    global GEN
-    GEN += 1
 
-    nets = []
-    ge = []
-    drones = []
-    target = Target()
+GEN = 0
+# per generation statistics file, handed the hit frames of every evaluation, see generation_stats.py
+STATS = None
+# draws the serial evaluations, None trains without a window, see viewer.py
+VIEWER = None
+# logs the episodes of the best genomes for replay.py, None records nothing
+RECORDER = None
+# worker processes used to evaluate a generation, None evaluates in this process
+POOL = None
+WORKERS = 1
+# coordinator handing the generations to remote worker processes, see distributed.py
+DISTRIBUTED = None
+# every genome is scored against this many targets, with its fitness averaged over them
+TARGETS_PER_GENOME = 1
+# seeds the targets of every generation, None draws them from the global random module
+SEED = None
+# every generation is scored on the same targets, needs a SEED
+FIXED_TARGETS = False
+# results of already simulated (genome, targets) pairs, None simulates every genome
+CACHE = None
+# drops hopeless drones before the time limit, None flies every drone to the end
+EARLY_STOPPING = None
+# flies headless episodes with the compiled kernel.py loop, False or numba missing keeps the NumPy path
+FUSED = kernel.available()
+# per phase wall time of the running generation, read by profiling.ProfileReporter
+TIMER = PhaseTimer()
+
+
+def episode_rng(generation):
+    if SEED is None:
+        return random
+    return random.Random("{0}-{1}".format(SEED, generation))
+
+
+def simulate(genomes, config, targets, viewer=None, generation=0, timer=None, early_stopping=None, recorder=None):
+    """
+    Runs one episode per target for every genome, all of them batched in one swarm.
+    Returns the fitness of every genome averaged over the targets and, per target and genome,
+    the frame the drone reached the target on (-1 if it never did).
+    Phase times are added to the timer. Drones culled by early_stopping get the time penalty
+    of their remaining frames at once. The viewer, if any, is handed every frame and draws at its own rate,
+    the recorder, a trajectory.Episode, keeps every frame.
+    """
+    if timer is None:
+        timer = PhaseTimer()
+    timer.start()
+
+    # drone k * len(genomes) + i flies genome i to target k
+    target_x = np.repeat([target.center()[0] for target in targets], len(genomes))
+    target_y = np.repeat([target.center()[1] for target in targets], len(genomes))
     successfull_drones = 0
-    first_collide = False
-
-    for _, g in genomes:
-        net = neat.nn.FeedForwardNetwork.create(g, config)
-        nets.append(net)
 
-        drone = Drone((SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2))
-        drone.old_distance = drone.distance_to_target(target)
-        drones.append(drone)
-        g.fitness = 0
-        ge.append(g)
-
-    # create the screen
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    # Title and icon
-    pygame.display.set_caption("Drone - NEAT")
+    swarm = DroneSwarm(len(targets) * len(genomes), (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2), PHYSICS)
+    # one network per drone, repacked together with the swarm
+    net = BatchNetwork.create(genomes, config).take(swarm.index % len(genomes))
+    swarm.old_distance = swarm.distance_to_target(target_x, target_y)
+    fitness = np.zeros(swarm.size)
+    hit_frames = np.full(swarm.size, -1)
+    if early_stopping is not None:
+        early_stopping.start(swarm.old_distance)
+    timer.lap("network_build")
 
     TIME_LIMIT = 5 * 60  # 10 SECOND
     time_counter = 0
+
+    if FUSED and viewer is None and recorder is None:
+        # every frame of every drone in one compiled pass, booked as physics
+        fitness, hit_frames = kernel.simulate(net, swarm.index, SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2, target_x, target_y,
+                                              PHYSICS, TIME_LIMIT, early_stopping)
+        timer.lap("physics")
+        return (fitness.reshape(len(targets), len(genomes)).mean(axis=0),
+                hit_frames.reshape(len(targets), len(genomes)))
+
     # Game Loop
-    running = True
-    while running:
-        clock.tick(60)
+    while True:
         time_counter += 1
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-                pygame.quit()
-                quit()
-
-        if len(drones) == 0 or time_counter >= TIME_LIMIT:
+        # every row of the swarm is a live drone, resolved ones are compacted away below
+        if swarm.size == 0 or time_counter >= TIME_LIMIT:
             break
 
-        for idx, drone in enumerate(drones):
-            output = nets[idx].activate((drone.cargo_rect.center[0] - target.center()[0],
-                                         drone.cargo_rect.center[1] - target.center()[1]))
-
-            if output[0] > 0.5:
-                drone.go_up()
-            if output[0] < -0.5:
-                drone.go_down()
-            if output[1] > 0.5:
-                drone.go_right()
-            if output[1] < -0.5:
-                drone.go_left()
-
-            drone.move()
-
-            if drone.x > SCREEN_WIDTH + 50 or drone.x < -50 or drone.y > SCREEN_HEIGHT + 50 or drone.y < -50:
-                drone.is_dead = True
-                ge[idx].fitness -= 1
-            if drone.distance_to_target(target) < 5:
-                drone.is_collided = True
-                if not first_collide:
-                    MAX_TIMES.append(time_counter / FPS)
-                    first_collide = True
-                successfull_drones += 1
-                ge[idx].fitness += 10
-
-            drone_new_distance = drone.distance_to_target(target)
-            if drone.old_distance < drone_new_distance:
-                ge[idx].fitness -= 0.1
-            if drone.old_distance > drone_new_distance:
-                ge[idx].fitness += 0.1
-            drone.old_distance = drone_new_distance
-
-            ge[idx].fitness -= 0.1  # for time
-
-            if drone.is_dead or drone.is_collided:
-                drones.pop(idx)
-                nets.pop(idx)
-                ge.pop(idx)
-
-        draw_screen(screen=screen, drones=drones, target=target, successfull=successfull_drones, generation=GEN)
-
-        pygame.display.update()
-
-    global SUCCESS_NUMBERS
-    SUCCESS_NUMBERS.append(successfull_drones)
+        cargo_x, cargo_y = swarm.cargo_center()
+        outputs = net.activate(np.stack((cargo_x - target_x, cargo_y - target_y), axis=-1))
+        timer.lap("inference")
+
+        swarm.control(outputs)
+        swarm.move()
+
+        out_of_screen = ((swarm.x > SCREEN_WIDTH + 50) | (swarm.x < -50) |
+                         (swarm.y > SCREEN_HEIGHT + 50) | (swarm.y < -50))
+        swarm.is_dead |= out_of_screen
+        timer.lap("physics")
+        drones = swarm.index
+        fitness[drones[out_of_screen]] -= 1
+
+        drone_new_distance = swarm.distance_to_target(target_x, target_y)
+        collided = drone_new_distance < 5
+        if collided.any():
+            swarm.is_collided |= collided
+            hit_frames[drones[collided]] = time_counter
+            successfull_drones += int(collided.sum())
+            fitness[drones[collided]] += 10
+
+        fitness[drones[swarm.old_distance < drone_new_distance]] -= 0.1
+        fitness[drones[swarm.old_distance > drone_new_distance]] += 0.1
+        swarm.old_distance = drone_new_distance
+
+        fitness[drones] -= 0.1  # for time
+
+        if early_stopping is not None:
+            frames_left = TIME_LIMIT - 1 - time_counter
+            culled = early_stopping.cull(swarm, swarm.alive(), drone_new_distance, frames_left)
+            swarm.is_dead |= culled
+            fitness[drones[culled]] -= 0.1 * frames_left
+        timer.lap("fitness")
+
+        if recorder is not None:
+            recorder.frame(swarm)
+
+        if viewer is not None:
+            viewer.frame(swarm, targets, target_x, target_y, fitness,
+                         text=[f'Success: {successfull_drones}', f'GEN: {generation}'])
+            timer.lap("rendering")
+
+        # drop the drones resolved this frame
+        keep = swarm.alive()
+        if not keep.all():
+            swarm.compact(keep)
+            net = net.take(np.flatnonzero(keep))
+            target_x = target_x[keep]
+            target_y = target_y[keep]
+            if early_stopping is not None:
+                early_stopping.compact(keep)
+            timer.lap("fitness")
+
+    return fitness.reshape(len(targets), len(genomes)).mean(axis=0), hit_frames.reshape(len(targets), len(genomes))
+
+
+def simulate_chunk(args):
+    # pool entry point, workers always run headless
+    genomes, config, target_positions, early_stopping = args
+    timer = PhaseTimer()
+    fitness, hit_frames = simulate(genomes, config, [Target(pos) for pos in target_positions], timer=timer,
+                                   early_stopping=early_stopping)
+    return fitness, hit_frames, timer.reset()
+
+
+def evaluate(ge, config, targets):
+    if DISTRIBUTED is not None:
+        target_positions = [(target.x, target.y) for target in targets]
+        fitness, hit_frames, phase_times = DISTRIBUTED.evaluate(ge, target_positions, EARLY_STOPPING)
+        TIMER.add(phase_times)
+    elif POOL is not None:
+        target_positions = [(target.x, target.y) for target in targets]
+        chunks = [list(chunk) for chunk in np.array_split(np.array(ge, dtype=object), WORKERS) if len(chunk)]
+        results = POOL.map(simulate_chunk, [(chunk, config, target_positions, EARLY_STOPPING) for chunk in chunks])
+        fitness = np.concatenate([chunk_fitness for chunk_fitness, _, _ in results])
+        hit_frames = np.concatenate([chunk_hit_frames for _, chunk_hit_frames, _ in results], axis=1)
+        # phase times summed over the workers
+        for _, _, phase_times in results:
+            TIMER.add(phase_times)
+    else:
+        viewer = VIEWER if VIEWER is not None and VIEWER.shows(GEN) else None
+        fitness, hit_frames = simulate(ge, config, targets, viewer=viewer, generation=GEN, timer=TIMER,
+                                       early_stopping=EARLY_STOPPING)
+    return fitness, hit_frames
+
+
+def record(ge, config, targets, fitness, generation):
+    # episodes are deterministic, so the best genomes fly theirs again with the recorder attached
+    best = RECORDER.select(fitness)
+    genomes = [ge[idx] for idx in best]
+    episode = Episode(len(targets) * len(genomes), (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2))
+    timer = PhaseTimer()
+    _, hit_frames = simulate(genomes, config, targets, timer=timer, early_stopping=EARLY_STOPPING, recorder=episode)
+    RECORDER.write(generation, episode, [g.key for g in genomes], fitness[best], targets, hit_frames)
+    # the recording pass replaces drawing the generation
+    TIMER.add({"rendering": sum(timer.reset().values())})
+
+
+def steady_state_args(genomes, config, generation):
+    # simulate_chunk arguments for genomes bred during `generation` of a steady state run
+    targets = random_targets(TARGETS_PER_GENOME, episode_rng(1 if FIXED_TARGETS else generation + 1))
+    return genomes, config, [(target.x, target.y) for target in targets], EARLY_STOPPING
+
+
+def steady_state_result(hit_frames, phase_times):
+    # a batch finished on a worker process, its phase times are summed like those of a pool generation
+    STATS.add_hits(hit_frames)
+    TIMER.add(phase_times)
+
+
+def steady_state_generation(generation):
+    # GEN counts the generations started, as main does in a generational run
+    global GEN
+    GEN = generation + 1
 
 
-def run(config_path, iteration_number):
-    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
-                                neat.DefaultSpeciesSet, neat.DefaultStagnation, config_path)
+def main(genomes, config):
+    global GEN
+    GEN += 1
 
-    p = neat.Population(config)
+    ge = [g for _, g in genomes]
+    # fixed targets reuse the first generation's ones
+    targets = random_targets(TARGETS_PER_GENOME, episode_rng(1 if FIXED_TARGETS else GEN))
+
+    if CACHE is None:
+        fitness, hit_frames = evaluate(ge, config, targets)
+    else:
+        # episodes are deterministic, a genome flown to the same targets again gets the same result
+        episode = tuple((target.x, target.y) for target in targets)
+        keys = [(genome_key(g), episode) for g in ge]
+        results = [CACHE.get(key) for key in keys]
+        misses = [idx for idx, result in enumerate(results) if result is None]
+
+        fitness = np.zeros(len(ge))
+        hit_frames = np.full((len(targets), len(ge)), -1)
+        if misses:
+            fitness[misses], hit_frames[:, misses] = evaluate([ge[idx] for idx in misses], config, targets)
+        for idx, result in enumerate(results):
+            if result is None:
+                CACHE.put(keys[idx], (fitness[idx], hit_frames[:, idx].copy()))
+            else:
+                fitness[idx], hit_frames[:, idx] = result
+
+        hits, _ = CACHE.reset_counters()
+        print("Fitness cache: {0} of {1} genomes reused, {2} simulations saved".format(
+            hits, len(ge), hits * len(targets)))
+
+    for idx, g in enumerate(ge):
+        g.fitness = float(fitness[idx])
+
+    # GEN counts from 1, the log numbers generations from 0 like neat and the stats file
+    if RECORDER is not None and RECORDER.records(GEN - 1):
+        record(ge, config, targets, fitness, GEN - 1)
+
+    if STATS is not None:
+        STATS.add_hits(hit_frames)
+
+
+def get_state():
+    # everything a resumed run needs besides the neat population
+    return {"GEN": GEN, "SEED": SEED, "TARGETS_PER_GENOME": TARGETS_PER_GENOME, "FIXED_TARGETS": FIXED_TARGETS}
+
+
+def set_state(state):
+    global GEN, SEED, TARGETS_PER_GENOME, FIXED_TARGETS
+    GEN = state["GEN"]
+    SEED = state["SEED"]
+    TARGETS_PER_GENOME = state["TARGETS_PER_GENOME"]
+    FIXED_TARGETS = state["FIXED_TARGETS"]
+
+
+def run(config_path, iteration_number, headless=False, workers=1, seed=None, targets=1,
+        checkpoint_interval=5, checkpoint_seconds=300, resume=None, profile=None, fixed_targets=False,
+        cache_size=0, stall_frames=None, cull_unreachable=False, coordinator=None, local_workers=0,
+        steady_state=False, batch_size=10, view_fps=30, view_top_k=None, view_every=1, record=None,
+        record_top_k=5, record_every=1, stats_path="generation-stats.csv", jit=True):
+    global VIEWER, RECORDER, POOL, WORKERS, DISTRIBUTED, SEED, TARGETS_PER_GENOME, FIXED_TARGETS, CACHE
+    global EARLY_STOPPING, STATS, FUSED
+    if steady_state and record is not None:
+        raise ValueError("steady state evolution has no generation episodes to record")
+    if steady_state and not headless:
+        raise ValueError("steady state evolution runs headless on worker processes")
+    if not headless and (workers > 1 or coordinator is not None):
+        # the viewer only sees episodes simulated in this process
+        raise ValueError("evaluation on worker processes runs headless")
+    if steady_state and cache_size > 0:
+        raise ValueError("steady state evolution does not use the fitness cache")
+    if not headless:
+        # pygame is only imported when there is something to watch
+        from viewer import Viewer
+        VIEWER = Viewer(SCREEN_WIDTH, SCREEN_HEIGHT, view_fps, view_top_k, view_every)
+    if record is not None:
+        RECORDER = TrajectoryRecorder(record, SCREEN_WIDTH, SCREEN_HEIGHT, record_top_k, record_every)
+    WORKERS = workers
+    FUSED = jit and kernel.available()
+    CACHE = FitnessCache(cache_size) if cache_size > 0 else None
+    if stall_frames is not None or cull_unreachable:
+        EARLY_STOPPING = EarlyStopping(stall_frames, cull_unreachable)
+
+    if resume is not None:
+        # seed, targets and random state come from the checkpoint
+        p, state = restore_checkpoint(resume)
+        set_state(state)
+    else:
+        if fixed_targets and seed is None:
+            raise ValueError("fixed targets need a seed")
+        SEED = seed
+        TARGETS_PER_GENOME = targets
+        FIXED_TARGETS = fixed_targets
+        if seed is not None:
+            # neat draws every mutation and crossover from the global random module
+            random.seed(seed)
+
+        config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                    neat.DefaultSpeciesSet, neat.DefaultStagnation, config_path)
+
+        p = neat.Population(config)
+
+    if steady_state and coordinator is not None:
+        raise ValueError("steady state evolution runs on the local worker processes")
+    if coordinator is not None:
+        DISTRIBUTED = DistributedEvaluator(coordinator, p.config)
+        DISTRIBUTED.spawn_local_workers(local_workers)
+    elif workers > 1 or steady_state:
+        POOL = multiprocessing.Pool(workers)
 
     p.add_reporter(neat.StdOutReporter(True))
     stats = neat.StatisticsReporter()
     p.add_reporter(stats)
-
-    winner = p.run(main, iteration_number)
-
-    # plt.xlabel("GENERATIONS")
-    # plt.ylabel("SUCCESFULL GENOMES")
-    # plt.plot(np.arange(iteration_number), SUCCESS_NUMBERS)
-    # plt.savefig("GENERATIONS vs SUCCESFULL GENOMES")
-    # plt.show()
-    #
-    # plt.xlabel("GENERATIONS")
-    # plt.ylabel("BEST TIMES")
-    # plt.plot(np.arange(iteration_number), MAX_TIMES)
-    # plt.savefig("GENERATIONS vs BEST TIMES")
-    # plt.show()
-
-    with open("winner.pkl", "wb") as f:
-        pickle.dump(winner, f)
-        f.close()
+    STATS = GenerationStatsReporter(stats_path, FPS, p.generation if resume is not None else None)
+    p.add_reporter(STATS)
+    if profile is not None:
+        p.add_reporter(ProfileReporter(TIMER, csv_path=profile + ".csv", json_path=profile + ".jsonl"))
+    checkpointer = AsyncCheckpointer(p, get_state, checkpoint_interval, checkpoint_seconds)
+    p.add_reporter(checkpointer)
+
+    try:
+        # iteration_number counts the generations of the resumed run too
+        if steady_state:
+            # the same number of evaluations as the generational run
+            evolution = SteadyStateEvolution(p, POOL, simulate_chunk, steady_state_args, workers, batch_size,
+                                             on_result=steady_state_result, on_generation=steady_state_generation)
+            winner = evolution.run((iteration_number - GEN) * p.config.pop_size)
+        else:
+            winner = p.run(main, iteration_number - GEN)
+    finally:
+        checkpointer.wait()
+        if POOL is not None:
+            POOL.close()
+            POOL.join()
+            POOL = None
+        if DISTRIBUTED is not None:
+            DISTRIBUTED.close()
+            DISTRIBUTED = None
+
+    # python generation_stats.py plots the successes and best times of the run
+    save_winner("winner.genome", winner)
+    export_network(winner, p.config, "winner.npz")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headless", action="store_true", help="train without the pygame window")
+    parser.add_argument("--view-fps", type=float, default=30, help="most frames per second the window draws")
+    parser.add_argument("--view-top", type=int, default=None, help="only draw the drones with the best fitness so far")
+    parser.add_argument("--view-every", type=int, default=1, help="only draw every Nth generation")
+    parser.add_argument("--record", default=None,
+                        help="append the episodes of the best genomes to this trajectory log, e.g. run.traj, "
+                             "see replay.py")
+    parser.add_argument("--record-top", type=int, default=5, help="genomes recorded per generation")
+    parser.add_argument("--record-every", type=int, default=1, help="only record every Nth generation")
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="evaluate every generation across this many processes, needs --headless")
+    parser.add_argument("--coordinator", default=None,
+                        help="hand the generations to workers connecting to this host:port or unix:/path address, "
+                             "needs --headless. Workers must have the same hex key in DRONE_NEAT_AUTHKEY, "
+                             "one is generated and printed if it is not set")
+    parser.add_argument("--local-workers", type=int, default=0,
+                        help="start this many worker processes on this machine for --coordinator")
+    parser.add_argument("--steady-state", action="store_true",
+                        help="breed new genomes as soon as evaluations finish instead of generation by generation, "
+                             "needs --headless and no --cache-size or --record")
+    parser.add_argument("--batch-size", type=int, default=10,
+                        help="genomes per worker task in --steady-state mode")
+    parser.add_argument("--no-jit", action="store_true",
+                        help="keep the NumPy frame loop even when numba is installed")
+    parser.add_argument("--seed", type=int, default=None, help="make the evolution and its targets reproducible")
+    parser.add_argument("--targets", type=int, default=1,
+                        help="score every genome on this many targets and average the fitness")
+    parser.add_argument("--fixed-targets", action="store_true",
+                        help="score every generation on the same seeded targets")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="remember the results of this many genomes instead of simulating them again")
+    parser.add_argument("--stall-frames", type=int, default=None,
+                        help="cull drones that have not got closer to the target for this many frames")
+    parser.add_argument("--cull-unreachable", action="store_true",
+                        help="cull drones that can not reach the target in the frames left")
+    parser.add_argument("--checkpoint-every", type=int, default=5, help="generations between checkpoints")
+    parser.add_argument("--checkpoint-seconds", type=float, default=300, help="seconds between checkpoints")
+    parser.add_argument("--resume", default=None, help="checkpoint file to continue training from")
+    parser.add_argument("--stats", default="generation-stats.csv",
+                        help="append the statistics of every generation to this CSV file")
+    parser.add_argument("--profile", default=None,
+                        help="print per phase timings and write them to PROFILE.csv and PROFILE.jsonl")
+    args = parser.parse_args()
+
     local_dir = os.path.dirname(__file__)
     print(local_dir)
     config_path = os.path.join(local_dir, "config-feedforward.txt")
     print(config_path)
-    run(config_path, 50)
+    run(config_path, args.generations, headless=args.headless, workers=args.workers,
+        seed=args.seed, targets=args.targets, checkpoint_interval=args.checkpoint_every,
+        checkpoint_seconds=args.checkpoint_seconds, resume=args.resume, profile=args.profile,
+        fixed_targets=args.fixed_targets, cache_size=args.cache_size, stall_frames=args.stall_frames,
+        cull_unreachable=args.cull_unreachable, coordinator=args.coordinator, local_workers=args.local_workers,
+        steady_state=args.steady_state, batch_size=args.batch_size, view_fps=args.view_fps,
+        view_top_k=args.view_top, view_every=args.view_every, record=args.record, record_top_k=args.record_top,
+        record_every=args.record_every, stats_path=args.stats, jit=not args.no_jit)
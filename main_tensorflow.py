@@ -1,373 +1,297 @@
-import pygame
+import argparse
 import random
-import neat
-from math import hypot
-import os
-from tensorflow.keras import Sequential
-from tensorflow.keras.layers import Dense
 import numpy as np
+from fitness_cache import FitnessCache, array_key
+from simulation import DroneSwarm, GA_PHYSICS, random_target
 
 KERAS_MODEL_SHAPE = [6, 2]  # 6 input 6 hidden 2 output
 
-SCREEN_WIDTH = 1200
-SCREEN_HEIGHT = 700
+PHYSICS = GA_PHYSICS
+SCREEN_WIDTH = PHYSICS.screen_width
+SCREEN_HEIGHT = PHYSICS.screen_height
 FPS = 30
 
-PLAYER_IMG = pygame.image.load("assets/drone.png")
-PLAYER_IMG_HEIGHT = PLAYER_IMG.get_height()
-PLAYER_IMG_WIDTH = PLAYER_IMG.get_width()
-
-GRAVITY = 0.5
-DRAG = 0.5
-
-# Initialize pygame
-pygame.init()
-pygame.font.init()
-myfont = pygame.font.SysFont('Comic Sans MS', 30)
-
 
 def create_model():
+    # TensorFlow is only needed for the Keras models, training runs on population_forward
+    from tensorflow.keras import Sequential
+    from tensorflow.keras.layers import Dense
+
     model = Sequential()
     # model.add(Dense(6, activation="relu", ))
     model.add(Dense(2, activation="tanh", input_dim=6))
     return model
 
 
-def selection_roulette_wheel(genes, scores):
+def load_brain(genome):
+    # Keras model with the genome's weights, for inspecting or exporting a single genome
+    new_weights = []
+    for i in range(len(KERAS_MODEL_SHAPE) - 1):
+        n = KERAS_MODEL_SHAPE[i] * KERAS_MODEL_SHAPE[i + 1]
+        new_weights.append(np.array(genome[:n]).reshape((KERAS_MODEL_SHAPE[i], KERAS_MODEL_SHAPE[i + 1])))
+        genome = genome[n:]
+    model = create_model()
+    model_weights = model.get_weights()
+    model_weights[::2] = new_weights
+    model.set_weights(model_weights)
+    return model
+
+
+def stack_brains(genomes):
+    # [pop, 6, 2] kernels of the create_model Dense layer, its bias stays zero
+    return np.asarray(genomes).reshape((-1, KERAS_MODEL_SHAPE[0], KERAS_MODEL_SHAPE[1]))
+
+
+def population_forward(weights, inputs):
     """
-    pi = fi / sum(fi)
+    Forward pass of every drone's brain in one batched op.
+    weights: [pop, 6, 2], inputs: [pop, 6], returns [pop, 2]
     """
-    probes = []
-    selected = []
-    sum_of_scores = np.sum(scores)
-    # Find probes
-    for idx, score in enumerate(scores):
-        # Normalize probes
-        probes.append((score / sum_of_scores))
-
-    for i in range(int(len(genes) / 2)):
-        turn_wheel = np.random.rand(1)[0]
-        counter = probes[0]
-        idx = 0
-        while counter < turn_wheel:
-            counter += probes[idx + 1]
-            idx += 1
-        selected.append(genes[idx])
-    return selected
-
-
-def crossover_single_point(p1, p2, p_crossover=1.0):
-    # Single point crossover
-    # Choosing a random crossover point
-    # default probability of crossover is 1.0
-    c1 = p1.copy()
-    c2 = p2.copy()
-    if np.random.rand(1)[0] < p_crossover:
-        crossover_point = np.random.randint(1, len(p1) - 1)
-        c1 = np.concatenate((p1[:crossover_point], p2[crossover_point:]))
-        c2 = np.concatenate((p2[:crossover_point], p1[crossover_point:]))
+    return np.tanh(np.einsum("pi,pio->po", inputs, weights))
+
+
+# The genetic operators work on the whole population at once, a [pop, n_weights] matrix with one
+# genome per row. rng is np.random or a np.random.RandomState.
+
+
+def roulette_indices(weights, count, rng=np.random):
+    # spins the wheel count times, p_i = w_i / sum(w), uniform if every weight is 0
+    cumulative = np.cumsum(weights, dtype=np.float64)
+    if cumulative[-1] <= 0:
+        return rng.randint(0, len(weights), count)
+    spins = rng.random_sample(count) * cumulative[-1]
+    return np.minimum(np.searchsorted(cumulative, spins, side="right"), len(weights) - 1)
+
+
+def selection_roulette_wheel(population, scores, count=None, rng=np.random):
+    """
+    pi = fi / sum(fi), after shifting the scores so the worst is 0, as the fitness goes negative.
+    Returns count rows of population, half of it by default.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if count is None:
+        count = len(scores) // 2
+    return population[roulette_indices(scores - scores.min(), count, rng)]
+
+
+def selection_rank(population, scores, count=None, rng=np.random):
+    """ Roulette on the ranks, p_i proportional to 1 for the worst up to pop for the best. """
+    if count is None:
+        count = len(scores) // 2
+    ranks = np.empty(len(scores))
+    ranks[np.argsort(scores, kind="stable")] = np.arange(1, len(scores) + 1)
+    return population[roulette_indices(ranks, count, rng)]
+
+
+def selection_tournament(population, scores, count=None, size=3, rng=np.random):
+    """ Every selected row is the best of `size` rows drawn at random. """
+    scores = np.asarray(scores)
+    if count is None:
+        count = len(scores) // 2
+    contenders = rng.randint(0, len(scores), (count, size))
+    winners = contenders[np.arange(count), np.argmax(scores[contenders], axis=1)]
+    return population[winners]
+
+
+SELECTIONS = {"roulette": selection_roulette_wheel, "rank": selection_rank, "tournament": selection_tournament}
+
+
+def crossover_single_point(parents1, parents2, p_crossover=1.0, rng=np.random):
+    """
+    Single point crossover of every pair of rows, each pair at its own random point.
+    A pair crosses with probability p_crossover, otherwise the children are copies of the parents.
+    """
+    pairs, length = parents1.shape
+    crossover_point = rng.randint(1, length - 1, pairs)
+    first = np.arange(length) < crossover_point[:, None]
+    first |= (rng.random_sample(pairs) >= p_crossover)[:, None]
+    c1 = np.where(first, parents1, parents2)
+    c2 = np.where(first, parents2, parents1)
     return c1, c2
 
 
+def mutate_gaussian(population, rate=0.1, sigma=0.1, rng=np.random):
+    # adds N(0, sigma) noise to each weight with probability rate
+    mutated = rng.random_sample(population.shape) < rate
+    return population + mutated * rng.normal(0.0, sigma, population.shape)
 
-# Player
-class Drone:
-
-    def __init__(self, pos=(340, 200)):
-        self.img = PLAYER_IMG
-        # coordinates
-        self.x = pos[0]
-        self.y = pos[1]
-        # velocity
-        self.y_vel = 0
-        self.x_vel = 0
-        # velocity boundaries
-        self.y_vel_up_boundary = -15
-        self.y_vel_down_boundary = 15
-        # acceleration
-        self.y_acc = 0
-        self.x_acc = 0
-        # rotation
-        self.rotation_angle = 0
-        self.old_distance = 0
-        self.old_x = pos[0]
-        self.best_distance = 9999
-
-        self.fitness_score = 0
-
-        self.cargo_rect = pygame.Rect(self.x + (PLAYER_IMG_WIDTH / 2) - 5, self.y + (PLAYER_IMG_HEIGHT / 2) + 6, 10, 10)
-
-        self.is_collided = False
-        self.is_dead = False
-
-    def load_brain(self, genome):
-        self.genome = genome
-        new_weights = []
-        for i in range(len(KERAS_MODEL_SHAPE) - 1):
-            n = KERAS_MODEL_SHAPE[i] * KERAS_MODEL_SHAPE[i + 1]
-            new_weights.append(np.array(genome[:n]).reshape((KERAS_MODEL_SHAPE[i], KERAS_MODEL_SHAPE[i + 1])))
-            genome = genome[n:]
-        self.model = create_model()
-        model_weights = self.model.get_weights()
-        model_weights[::2] = new_weights
-        self.model.set_weights(model_weights)
-        self.model.compile()
-
-    def brain_action(self, inputs):
-        return self.model.predict(inputs)
-
-    def go_up(self):
-        self.y_acc = -1
-
-    def go_right(self):
-        self.x_acc = 1
-        self.rotation_angle += -5
-
-    def go_left(self):
-        self.x_acc = -1
-        self.rotation_angle += 5
-
-    def move(self):
-        # y movement
-        self.y_vel += self.y_acc + GRAVITY
-        if self.y_vel < self.y_vel_up_boundary:
-            self.y_vel = self.y_vel_up_boundary
-        elif self.y_vel > self.y_vel_down_boundary:
-            self.y_vel = self.y_vel_down_boundary
-        self.y += self.y_vel
-        self.y_acc = 0
-        # x movement
-        self.x_vel += self.x_acc
-        if self.x_vel > 0:
-            self.x_vel -= DRAG
-        elif self.x_vel < 0:
-            self.x_vel += DRAG
-        if self.x_vel > 10:
-            self.x_vel = 10
-        elif self.x_vel < -10:
-            self.x_vel = -10
-        self.x += self.x_vel
-        self.x_acc = 0
-        # rotation
-        if self.rotation_angle > 30:
-            self.rotation_angle = 30
-        elif self.rotation_angle < -30:
-            self.rotation_angle = -30
-        if self.rotation_angle > 0:
-            self.rotation_angle -= 2
-        elif self.rotation_angle < 0:
-            self.rotation_angle += 2
-
-    def draw(self, screen):
-        self.cargo_rect = pygame.Rect(self.x + (PLAYER_IMG_WIDTH / 2) - 5, self.y + (PLAYER_IMG_HEIGHT / 2) + 6, 10, 10)
-        rotated_img = pygame.transform.rotate(self.img, self.rotation_angle)
-        new_rect = rotated_img.get_rect(
-            center=self.img.get_rect(topleft=(self.x, self.y)).center)
-        screen.blit(rotated_img, new_rect.topleft)
-
-    def draw_rectangles(self, screen):
-        cargo_rect = pygame.Rect(self.x + (PLAYER_IMG_WIDTH / 2) - 5, self.y + (PLAYER_IMG_HEIGHT / 2) + 6, 10, 10)
-        pygame.draw.rect(screen, (255, 0, 0), pygame.Rect(self.x, self.y, PLAYER_IMG_WIDTH, PLAYER_IMG_HEIGHT))
-        pygame.draw.rect(screen, (0, 255, 0), cargo_rect)
-
-    def draw_line_to_target(self, screen, target):
-        pygame.draw.line(screen, (0, 0, 255), self.cargo_rect.center, target.center())
-
-    def distance_to_target(self, target):
-        return hypot(target.center()[0] - self.cargo_rect.center[0], target.center()[1] - self.cargo_rect.center[1])
-
-
-class Target:
-
-    def __init__(self):
-        self.x = random.randint(30, SCREEN_WIDTH - 30)
-        self.y = random.randint(30, SCREEN_HEIGHT - 30)
-        self.width = 5
-        self.color = (0, 255, 0)
-
-    def draw(self, screen):
-        pygame.draw.circle(screen, self.color, (self.x, self.y), self.width)
-
-    def center(self):
-        return self.x + (self.width / 2), self.y + (self.width / 2)
-
-
-def draw_screen(screen, drones, target, successfull, generation):
-    screen.fill((0, 0, 0))
-    for drone in drones:
-        drone.draw_rectangles(screen=screen)
-        drone.draw_line_to_target(screen=screen, target=target)
-        # drone.draw(screen=screen)
-
-    target.draw(screen=screen)
-
-    textsurface = myfont.render(f'Success: {successfull}', False, (255, 255, 255))
-    screen.blit(textsurface, (0, 0))
-
-    textsurface = myfont.render(f'GEN: {generation}', False, (255, 255, 255))
-    screen.blit(textsurface, (0, 20))
+
+def next_generation(population, scores, size=None, selection="roulette", p_crossover=1.0, mutation_rate=0.1,
+                    mutation_sigma=0.1, rng=np.random):
+    """ Breeds `size` children, as many as population has rows by default, from the scored genomes. """
+    if size is None:
+        size = len(population)
+    parents = SELECTIONS[selection](population, scores, size + size % 2, rng=rng)
+    c1, c2 = crossover_single_point(parents[0::2], parents[1::2], p_crossover, rng)
+    children = np.concatenate((c1, c2))[:size]
+    return mutate_gaussian(children, mutation_rate, mutation_sigma, rng)
 
 
 GEN = 0
+# seeds the target of every generation, None draws them from the global random module
+SEED = None
+# every generation flies to the first one's target, only then can the fitness cache hit across generations
+FIXED_TARGETS = False
+
 
+def episode_rng(generation):
+    if SEED is None:
+        return random
+    return random.Random("{0}-{1}".format(SEED, generation))
 
-def main(genomes):
-    clock = pygame.time.Clock()
 
+def main(genomes, headless=False, cache=None):
     global GEN
     GEN += 1
 
-    drones = []
-    done_drones = []
-    target = Target()
+    target = random_target(PHYSICS, rng=episode_rng(1 if FIXED_TARGETS else GEN))
+    target_x, target_y = target.center()
     successfull_drones = 0
-    # drone = Drone()
 
-    # rand_x = random.randint(10, SCREEN_WIDTH - 10)
-    # rand_y = random.randint(10, SCREEN_HEIGHT - 10)
-    for genome in genomes:
-        drone = Drone((SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2))
-        drone.load_brain(genome)
-        drone.old_distance = drone.distance_to_target(target)
-        drones.append(drone)
+    genomes = np.asarray(genomes)
+    # genomes already flown to this target, or repeated in this generation, are not simulated again
+    reused = []
+    simulated = np.arange(len(genomes))
+    if cache is not None:
+        keys = [(array_key(genome), (target.x, target.y)) for genome in genomes]
+        # the scores of this generation by key, the cache is only read once per key, as the puts
+        # after the episode may evict what was read
+        known_scores = {}
+        simulated_keys = set()
+        simulated = []
+        for idx in range(len(genomes)):
+            key = keys[idx]
+            if key not in simulated_keys and key not in known_scores:
+                score = cache.get(key)
+                if score is None:
+                    simulated_keys.add(key)
+                    simulated.append(idx)
+                    continue
+                known_scores[key] = score
+            reused.append(idx)
+        simulated = np.array(simulated, dtype=np.int64)
+
+    # swarm row i flies genomes[simulated[i]], rows and brains are compacted together
+    swarm = DroneSwarm(len(simulated), (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2), PHYSICS)
+    brains = stack_brains(genomes[simulated])
+    swarm.old_distance = swarm.distance_to_target(target_x, target_y)
+    fitness_scores = np.zeros(swarm.size)
+    # rows in the order their drones finished, the ones still flying at the time limit last
+    done_drones = []
 
-    # create the screen
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    # Title and icon
-    pygame.display.set_caption("Drone - NEAT")
+    viewer = None
+    if not headless:
+        # pygame is only imported when there is something to watch
+        from viewer import Viewer
+        viewer = Viewer(SCREEN_WIDTH, SCREEN_HEIGHT, fps=FPS)
 
     TIME_LIMIT = 5 * FPS  # SECOND
     time_counter = 0
     # Game Loop
-    running = True
-    while running:
-        clock.tick(FPS)
+    while True:
         time_counter += 1
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-                pygame.quit()
-                quit()
-
-        if len(drones) == 0:
-            break
-
-        if time_counter >= TIME_LIMIT:
-            # sum_of_distances = 0
-            # for drone in drones:
-            #     sum_of_distances += drone.best_distance
-            # average_distance = sum_of_distances / len(drones)
-            # for idx, drone in enumerate(drones):
-            #     print((average_distance - drone.best_distance) / 10)
-            #     ge[idx].fitness += (average_distance - drone.best_distance) / 10
+        if swarm.size == 0 or time_counter >= TIME_LIMIT:
             break
 
-        for idx, drone in enumerate(drones):
-            inputs = np.array([drone.cargo_rect.center[0], drone.cargo_rect.center[1],
-                               target.center()[0], target.center()[1],
-                               drone.x_vel, drone.y_vel])
-
-            output = drone.brain_action(inputs.reshape((-1, 6)))
-
-            # print(output)
-            if output[0][0] > 0:
-                drone.go_up()
-            if output[0][1] > 0:
-                drone.go_right()
-            if output[0][1] < 0:
-                drone.go_left()
-
-            drone.move()
-
-            if drone.x > SCREEN_WIDTH + 20 or drone.x < -20 or drone.y > SCREEN_HEIGHT + 20 or drone.y < -20:
-                drone.is_dead = True
-                drone.fitness_score -= 1
-            if drone.distance_to_target(target) < 15:
-                drone.is_collided = True
-                successfull_drones += 1
-                drone.fitness_score += 10
-
-            # point = drone.distance_to_target(target) / 10000
-            # print(point)
-            # ge[idx].fitness -= point
-            # if drone.x == drone.old_x:
-            #     ge[idx].fitness -= 1
-            # drone.old_x = drone.x
-
-            drone_new_distance = drone.distance_to_target(target)
-            if drone.old_distance < drone_new_distance:
-                drone.fitness_score -= 0.1
-            if drone.old_distance > drone_new_distance:
-                drone.fitness_score += 0.1
-            drone.old_distance = drone_new_distance
-            # if drone.best_distance > drone_new_distance:
-            #     drone.best_distance = drone_new_distance
-            # ge[idx].fitness -= 0.1  # for time
-
-            if drone.is_dead or drone.is_collided:
-                done_drones.append(drones.pop(idx))
-
-        draw_screen(screen=screen, drones=drones, target=target, successfull=successfull_drones, generation=GEN)
-
-        pygame.display.update()
-
-    for idx, drone in enumerate(drones):
-        done_drones.append(drones.pop(idx))
-
-    drone_genomes = []
-    drone_scores = []
-    for drone in done_drones:
-        drone_genomes.append(drone.genome)
-        drone_scores.append(drone.fitness_score)
-
-    return drone_genomes, drone_scores
-
-
-def initialize_genomes(population_size):
-    genomes = []
-    for i in range(population_size):
-        model = create_model()
-        weights = np.array(model.get_weights())
-        # print(weights)
-        weights = weights[::2]
-        weights_1d = np.concatenate([weight.reshape(-1) for weight in weights])
-        genomes.append(weights_1d)
-    return genomes
-
-
-# def load_brain(genome):
-#     new_weights = []
-#     for i in range(len(KERAS_MODEL_SHAPE) - 1):
-#         n = KERAS_MODEL_SHAPE[i] * KERAS_MODEL_SHAPE[i + 1]
-#         new_weights.append(np.array(genome[:n]).reshape((KERAS_MODEL_SHAPE[i], KERAS_MODEL_SHAPE[i + 1])))
-#         genome = genome[n:]
-#     model = create_model()
-#     model_weights = model.get_weights()
-#     model_weights[::2] = new_weights
-#     model.set_weights(model_weights)
-#     return model
-
-
-def run(iteration):
-    genomes = initialize_genomes(4)
-    # model = load_brain(genomes[0])
-    # x = np.array([632, 393, 932.5, 526.5, 0, 0])
-    # x = x.reshape((-1, 6))
-    # print(model.predict(x))
+        cargo_x, cargo_y = swarm.cargo_center()
+        inputs = np.stack((cargo_x, cargo_y, np.full(swarm.size, target_x), np.full(swarm.size, target_y),
+                           swarm.x_vel, swarm.y_vel), axis=-1)
+        outputs = population_forward(brains, inputs)
+
+        swarm.steer(up=outputs[:, 0] > 0, right=outputs[:, 1] > 0, left=outputs[:, 1] < 0)
+        swarm.move()
+        drones = swarm.index
+
+        out_of_screen = ((swarm.x > SCREEN_WIDTH + 20) | (swarm.x < -20) |
+                         (swarm.y > SCREEN_HEIGHT + 20) | (swarm.y < -20))
+        swarm.is_dead |= out_of_screen
+        fitness_scores[drones[out_of_screen]] -= 1
+
+        drone_new_distance = swarm.distance_to_target(target_x, target_y)
+        collided = drone_new_distance < 15
+        swarm.is_collided |= collided
+        successfull_drones += int(collided.sum())
+        fitness_scores[drones[collided]] += 10
+
+        fitness_scores[drones[swarm.old_distance < drone_new_distance]] -= 0.1
+        fitness_scores[drones[swarm.old_distance > drone_new_distance]] += 0.1
+        swarm.old_distance = drone_new_distance
+
+        if viewer is not None:
+            viewer.frame(swarm, [target], np.full(swarm.size, target_x), np.full(swarm.size, target_y),
+                         fitness_scores, text=[f'Success: {successfull_drones}', f'GEN: {GEN}'], sprites=False)
+
+        keep = swarm.alive()
+        if not keep.all():
+            done_drones.append(drones[~keep])
+            swarm.compact(keep)
+            brains = brains[keep]
+
+    done_drones.append(swarm.index)
+    done_drones = np.concatenate(done_drones)
+
+    # rows of genomes and their scores, in the finishing order
+    order = simulated[done_drones]
+    drone_scores = fitness_scores[done_drones]
+    if cache is not None:
+        for idx, score in zip(order, drone_scores):
+            cache.put(keys[idx], score)
+            known_scores[keys[idx]] = score
+        order = np.concatenate((order, np.array(reused, dtype=np.int64)))
+        drone_scores = np.concatenate((drone_scores, [known_scores[keys[idx]] for idx in reused]))
+        hits, _ = cache.reset_counters()
+        print("Fitness cache: {0} hits, {1} repeats within the generation, {2} simulations saved".format(
+            hits, len(reused) - hits, len(reused)))
+
+    return genomes[order], drone_scores
+
+
+def initialize_genomes(population_size, rng=np.random):
+    # glorot uniform, the initializer of the Dense kernel in create_model, one genome per row
+    fan_in, fan_out = KERAS_MODEL_SHAPE[0], KERAS_MODEL_SHAPE[1]
+    limit = np.sqrt(6 / (fan_in + fan_out))
+    return rng.uniform(-limit, limit, (population_size, fan_in * fan_out))
+
+
+def run(iteration, headless=False, cache_size=0, population_size=4, selection="roulette", p_crossover=1.0,
+        mutation_rate=0.1, mutation_sigma=0.1, seed=None, fixed_targets=False):
+    global SEED, FIXED_TARGETS
+    if fixed_targets and seed is None:
+        raise ValueError("fixed targets need a seed")
+    if cache_size > 0 and not fixed_targets:
+        # the cache is keyed by the target, which changes every generation otherwise
+        raise ValueError("the fitness cache needs fixed targets")
+    SEED = seed
+    FIXED_TARGETS = fixed_targets
+    rng = np.random if seed is None else np.random.RandomState(seed)
+
+    cache = FitnessCache(cache_size) if cache_size > 0 else None
+    genomes = initialize_genomes(population_size, rng)
     for i in range(iteration):
-        drone_genomes, drone_scores = main(genomes)
-        print("Drone Genomes: ", len(drone_genomes))
-        # print("Drone Scores: ", drone_scores)
-        selected_parents = selection_roulette_wheel(drone_genomes, drone_scores)
-        new_genomes = []
-        len_selected_parents = len(selected_parents)
-        for idx in range(len_selected_parents):
-            c1, c2 = crossover_single_point(selected_parents[random.randint(0, len_selected_parents-1)], selected_parents[random.randint(0, len_selected_parents-1)])
-            new_genomes.append(c1)
-            new_genomes.append(c2)
-        genomes = new_genomes
-        print(len(genomes))
+        drone_genomes, drone_scores = main(genomes, headless=headless, cache=cache)
+        print("Generation {0}: best fitness {1:.1f}, mean {2:.1f}".format(GEN, drone_scores.max(), drone_scores.mean()))
+        genomes = next_generation(drone_genomes, drone_scores, population_size, selection, p_crossover,
+                                  mutation_rate, mutation_sigma, rng)
+
 
 if __name__ == "__main__":
-    run(50)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headless", action="store_true", help="train without the pygame window")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="remember the scores of this many genomes instead of simulating them again, "
+                             "needs --fixed-targets")
+    parser.add_argument("--seed", type=int, default=None, help="make the evolution and its targets reproducible")
+    parser.add_argument("--fixed-targets", action="store_true",
+                        help="fly every generation to the same seeded target")
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--population", type=int, default=4, help="genomes per generation")
+    parser.add_argument("--selection", choices=sorted(SELECTIONS), default="roulette")
+    parser.add_argument("--crossover", type=float, default=1.0, help="probability a pair of parents crosses over")
+    parser.add_argument("--mutation-rate", type=float, default=0.1, help="probability a weight is mutated")
+    parser.add_argument("--mutation-sigma", type=float, default=0.1, help="standard deviation of a weight mutation")
+    args = parser.parse_args()
+
+    run(args.generations, headless=args.headless, cache_size=args.cache_size, population_size=args.population,
+        selection=args.selection, p_crossover=args.crossover, mutation_rate=args.mutation_rate,
+        mutation_sigma=args.mutation_sigma, seed=args.seed, fixed_targets=args.fixed_targets)
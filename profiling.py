@@ -0,0 +1,86 @@
+import csv
+import json
+import os
+import time
+from collections import defaultdict
+
+from neat.reporting import BaseReporter
+
+PHASES = ["network_build", "inference", "physics", "fitness", "rendering", "frame_limiter"]
+
+
+class PhaseTimer:
+    """
+    Accumulates wall time per phase. `lap(phase)` charges the time since the previous
+    lap (or `start()`) to the phase, so every timed section costs one perf_counter call.
+    """
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self.last = time.perf_counter()
+
+    def start(self):
+        self.last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.totals[phase] += now - self.last
+        self.last = now
+
+    def add(self, totals):
+        # merges the totals of a worker process
+        for phase, seconds in totals.items():
+            self.totals[phase] += seconds
+
+    def reset(self):
+        totals = dict(self.totals)
+        self.totals.clear()
+        return totals
+
+
+class ProfileReporter(BaseReporter):
+    """ Prints the phase timings of every generation and appends them to CSV and JSON lines files. """
+
+    def __init__(self, timer, csv_path=None, json_path=None):
+        self.timer = timer
+        self.csv_path = csv_path
+        self.json_path = json_path
+        self.generation = None
+        self.generation_start_time = None
+        self.evaluation_end_time = None
+
+        # resumed runs keep appending to the same files
+        if csv_path is not None and not os.path.exists(csv_path):
+            with open(csv_path, "w", newline="") as f:
+                csv.writer(f).writerow(["generation", "total", "evaluation", "reproduction"] + PHASES)
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.timer.reset()
+        self.generation_start_time = time.perf_counter()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        self.evaluation_end_time = time.perf_counter()
+
+    def end_generation(self, config, population, species_set):
+        end_time = time.perf_counter()
+        phases = self.timer.reset()
+        record = {
+            "generation": self.generation,
+            "total": end_time - self.generation_start_time,
+            "evaluation": self.evaluation_end_time - self.generation_start_time,
+            "reproduction": end_time - self.evaluation_end_time,
+        }
+        for phase in PHASES:
+            record[phase] = phases.get(phase, 0.0)
+
+        print("Phase times: " + ", ".join("{0} {1:.3f}s".format(phase, record[phase])
+                                          for phase in ["evaluation", "reproduction"] + PHASES))
+
+        if self.csv_path is not None:
+            with open(self.csv_path, "a", newline="") as f:
+                csv.writer(f).writerow([record["generation"], record["total"], record["evaluation"],
+                                        record["reproduction"]] + [record[phase] for phase in PHASES])
+        if self.json_path is not None:
+            with open(self.json_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
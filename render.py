@@ -0,0 +1,44 @@
+import numpy as np
+import pygame
+
+from resources import rotated_player_img, font
+
+WHITE = (255, 255, 255)
+
+
+def round_coordinate(v):
+    # half away from zero, how pygame rounds a float assigned to Rect.topleft
+    rounded = int(v)
+    if abs(v - rounded) >= 0.5:
+        rounded += 1 if v > 0 else -1
+    return rounded
+
+
+def draw_screen(screen, swarm, targets, target_x, target_y, text=(), text_color=WHITE, sprites=True, rows=None):
+    """
+    Draws the swarm rows in `rows`, the live drones if None, each with its hitbox, cargo and a line
+    to its target at (target_x[i], target_y[i]), then the targets and one line of text per entry of `text`.
+    """
+    screen.fill((0, 0, 0))
+    width, height = swarm.params.img_width, swarm.params.img_height
+    cargo_x, cargo_y = swarm.cargo_center()
+    if rows is None:
+        rows = np.flatnonzero(swarm.alive())
+    for idx in rows:
+        x, y = swarm.x[idx], swarm.y[idx]
+        cargo_center = (cargo_x[idx], cargo_y[idx])
+        # rectangles
+        pygame.draw.rect(screen, (255, 0, 0), pygame.Rect(x, y, width, height))
+        pygame.draw.rect(screen, (0, 255, 0), pygame.Rect(cargo_center[0] - 5, cargo_center[1] - 5, 10, 10))
+        # line to target
+        pygame.draw.line(screen, (0, 0, 255), cargo_center, (target_x[idx], target_y[idx]))
+        # drone
+        if sprites:
+            rotated_img, (dx, dy) = rotated_player_img(float(swarm.rotation_angle[idx]))
+            screen.blit(rotated_img, (round_coordinate(x) + dx, round_coordinate(y) + dy))
+
+    for target in targets:
+        pygame.draw.circle(screen, (0, 255, 0), (target.x, target.y), target.width)
+
+    for i, line in enumerate(text):
+        screen.blit(font().render(line, False, text_color), (0, 20 * i))
@@ -0,0 +1,80 @@
+import argparse
+import os
+
+import numpy as np
+import pygame
+
+from render import draw_screen
+from resources import init_pygame
+from simulation import DroneSwarm, PhysicsParams, Target
+from trajectory import load_trajectories
+
+
+def render_chunk(screen, chunk, width, height, start=0, stop=None, step=1):
+    """ Yields the screen after drawing each selected frame of a recorded episode. """
+    swarm = DroneSwarm(chunk.drones, params=PhysicsParams(screen_width=width, screen_height=height))
+    # the log keeps the corner of every drone's target, the line is drawn to its center
+    drone_targets = [(int(x), int(y)) for x, y in zip(chunk.target_x.tolist(), chunk.target_y.tolist())]
+    targets = {pos: Target(pos) for pos in drone_targets}
+    target_x = np.array([targets[pos].center()[0] for pos in drone_targets])
+    target_y = np.array([targets[pos].center()[1] for pos in drone_targets])
+
+    for frame in range(start, chunk.frames if stop is None else min(stop, chunk.frames), step):
+        swarm.x = chunk.x[frame].astype(np.float64)
+        swarm.y = chunk.y[frame].astype(np.float64)
+        swarm.rotation_angle = chunk.rotation[frame].astype(np.float64)
+        alive = chunk.alive[frame].astype(bool)
+        draw_screen(screen, swarm, list(targets.values()), target_x, target_y,
+                    text=["GEN: {0}".format(chunk.generation), "Frame: {0}".format(frame + 1),
+                          "Hits: {0}".format(int(((chunk.hit_frame >= 0) & (chunk.hit_frame <= frame + 1)).sum()))],
+                    rows=np.flatnonzero(alive))
+        yield screen
+
+
+def write_frames(frames, output, fps):
+    """ A .mp4 or .gif output is encoded with imageio, anything else is a directory of PNG frames. """
+    if os.path.splitext(output)[1].lower() in [".mp4", ".gif"]:
+        # only needed for video files
+        import imageio
+        with imageio.get_writer(output, fps=fps) as writer:
+            for screen in frames:
+                writer.append_data(pygame.surfarray.array3d(screen).swapaxes(0, 1))
+        return
+    os.makedirs(output, exist_ok=True)
+    for i, screen in enumerate(frames):
+        pygame.image.save(screen, os.path.join(output, "frame{0:06d}.png".format(i)))
+
+
+def selected_chunks(chunks, generations):
+    if generations is None:
+        return chunks
+    return [chunk for chunk in chunks if chunk.generation in generations]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="render a trajectory log written by main.py --record")
+    parser.add_argument("log")
+    parser.add_argument("--list", action="store_true", help="print the recorded episodes and exit")
+    parser.add_argument("--generation", type=int, nargs="*", default=None, help="only these generations")
+    parser.add_argument("--output", default="replay", help="a .mp4 or .gif file, otherwise a directory of PNG frames")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--start", type=int, default=0, help="first frame of every episode")
+    parser.add_argument("--stop", type=int, default=None, help="frame to stop every episode at")
+    parser.add_argument("--step", type=int, default=1, help="only render every Nth frame")
+    args = parser.parse_args()
+
+    width, height, chunks = load_trajectories(args.log)
+    chunks = selected_chunks(chunks, args.generation)
+    if args.list:
+        for chunk in chunks:
+            print("generation {0}: {1} drones, {2} frames, {3} hits, best fitness {4:.2f}".format(
+                chunk.generation, chunk.drones, chunk.frames, int((chunk.hit_frame >= 0).sum()),
+                float(chunk.fitness.max()) if chunk.drones else float("nan")))
+    else:
+        # frames are drawn off screen, no window opens
+        init_pygame()
+        screen = pygame.Surface((width, height))
+        frames = (frame for chunk in chunks
+                  for frame in render_chunk(screen, chunk, width, height, args.start, args.stop, args.step))
+        write_frames(frames, args.output, args.fps)
+        print("Saved {0}".format(args.output))
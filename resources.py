@@ -0,0 +1,71 @@
+import os
+import struct
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+PLAYER_IMG_PATH = os.path.join(ASSETS_DIR, "drone.png")
+
+
+def png_size(path):
+    # width and height from the IHDR chunk, the physics needs the sprite size but not the sprite
+    with open(path, "rb") as f:
+        header = f.read(24)
+    return struct.unpack(">II", header[16:24])
+
+
+PLAYER_IMG_WIDTH, PLAYER_IMG_HEIGHT = png_size(PLAYER_IMG_PATH)
+
+# loaded on first use, only the renderers need pygame initialized
+PLAYER_IMG = None
+FONT = None
+# angle -> (rotated sprite, blit offset from the unrotated top left)
+ROTATED_PLAYER_IMGS = {}
+
+
+def init_pygame():
+    import pygame
+    if not pygame.get_init():
+        pygame.init()
+        pygame.font.init()
+
+
+def player_img():
+    global PLAYER_IMG
+    if PLAYER_IMG is None:
+        import pygame
+        PLAYER_IMG = pygame.image.load(PLAYER_IMG_PATH)
+    return PLAYER_IMG
+
+
+def rotated_player_img(angle):
+    """
+    pygame.transform.rotate(player_img(), angle) and the offset that centers it on the unrotated sprite.
+    The drones only tilt in whole degrees within +-30, those are built together on the first call,
+    so call it once the display is set.
+    """
+    if not ROTATED_PLAYER_IMGS:
+        for whole_angle in range(-30, 31):
+            ROTATED_PLAYER_IMGS[float(whole_angle)] = rotate_player_img(whole_angle)
+    sprite = ROTATED_PLAYER_IMGS.get(angle)
+    if sprite is None:
+        sprite = ROTATED_PLAYER_IMGS[angle] = rotate_player_img(angle)
+    return sprite
+
+
+def rotate_player_img(angle):
+    import pygame
+    img = player_img()
+    rotated = pygame.transform.rotate(img, angle)
+    if pygame.display.get_surface() is not None:
+        # in the display's pixel format, blitting then costs a tenth of converting on every blit
+        rotated = rotated.convert_alpha()
+    offset = (img.get_width() // 2 - rotated.get_width() // 2, img.get_height() // 2 - rotated.get_height() // 2)
+    return rotated, offset
+
+
+def font():
+    global FONT
+    if FONT is None:
+        import pygame
+        init_pygame()
+        FONT = pygame.font.SysFont('Comic Sans MS', 30)
+    return FONT
@@ -0,0 +1,283 @@
+import math
+import random
+
+import numpy as np
+
+from resources import PLAYER_IMG_WIDTH, PLAYER_IMG_HEIGHT
+
+
+class PhysicsParams:
+    """
+    The dynamics of one game mode. x_vel_boundary None leaves the horizontal speed unbounded,
+    y_drag False leaves the vertical speed to gravity and the velocity boundary alone.
+    """
+
+    def __init__(self, gravity=0, drag=0.5, y_vel_boundary=5, x_vel_boundary=10, y_drag=True,
+                 screen_width=1200, screen_height=700, img_size=(PLAYER_IMG_WIDTH, PLAYER_IMG_HEIGHT)):
+        self.gravity = gravity
+        self.drag = drag
+        self.y_vel_boundary = y_vel_boundary
+        self.x_vel_boundary = x_vel_boundary
+        self.y_drag = y_drag
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.img_width, self.img_height = img_size
+
+
+# main.py and game_with_winner.py
+NEAT_PHYSICS = PhysicsParams()
+# main_tensorflow.py
+GA_PHYSICS = PhysicsParams(gravity=0.5, y_vel_boundary=15, y_drag=False)
+# game.py, flown with the arrow keys
+MANUAL_PHYSICS = PhysicsParams(gravity=0.5, y_vel_boundary=15, x_vel_boundary=None, y_drag=False,
+                               screen_width=800, screen_height=600)
+
+
+class DroneSwarm:
+    """
+    Every drone of an episode as a structure of arrays, stepped with one vectorized update.
+    Drone steps a single drone through the same dynamics.
+    """
+
+    def __init__(self, size, pos=(340, 200), params=NEAT_PHYSICS):
+        self.size = size
+        self.params = params
+        # coordinates
+        self.x = np.full(size, pos[0], dtype=np.float64)
+        self.y = np.full(size, pos[1], dtype=np.float64)
+        # velocity
+        self.y_vel = np.zeros(size)
+        self.x_vel = np.zeros(size)
+        # acceleration
+        self.y_acc = np.zeros(size)
+        self.x_acc = np.zeros(size)
+        # rotation
+        self.rotation_angle = np.zeros(size)
+        self.old_distance = np.zeros(size)
+
+        self.is_collided = np.zeros(size, dtype=bool)
+        self.is_dead = np.zeros(size, dtype=bool)
+        # id every drone had when the swarm was created, rows move when the swarm is compacted
+        self.index = np.arange(size)
+
+    def alive(self):
+        return ~(self.is_collided | self.is_dead)
+
+    def compact(self, keep):
+        # drops the drones outside the keep mask in one pass, so the next frames only cost the live drones
+        for name in ["x", "y", "y_vel", "x_vel", "y_acc", "x_acc", "rotation_angle", "old_distance",
+                     "is_collided", "is_dead", "index"]:
+            setattr(self, name, getattr(self, name)[keep])
+        self.size = len(self.index)
+
+    def steer(self, up=None, down=None, right=None, left=None):
+        # boolean masks of the drones pressing each control, down wins over up and left over right
+        if up is not None:
+            self.y_acc[up] = -1
+        if down is not None:
+            self.y_acc[down] = 1
+        if right is not None:
+            self.x_acc[right] = 1
+            self.rotation_angle -= 5 * right
+        if left is not None:
+            self.x_acc[left] = -1
+            self.rotation_angle += 5 * left
+
+    def control(self, outputs):
+        # NEAT network outputs, each control is pressed past 0.5 either way
+        self.steer(up=outputs[:, 0] > 0.5, down=outputs[:, 0] < -0.5,
+                   right=outputs[:, 1] > 0.5, left=outputs[:, 1] < -0.5)
+
+    def move(self):
+        """ One frame of the physics, the step every game mode runs. """
+        params = self.params
+        # y movement
+        self.y_vel += self.y_acc + params.gravity
+        np.clip(self.y_vel, -params.y_vel_boundary, params.y_vel_boundary, out=self.y_vel)
+        if params.y_drag:
+            self.y_vel -= np.sign(self.y_vel) * params.drag
+        self.y += self.y_vel
+        self.y_acc[:] = 0
+        # x movement
+        self.x_vel += self.x_acc
+        self.x_vel -= np.sign(self.x_vel) * params.drag
+        if params.x_vel_boundary is not None:
+            np.clip(self.x_vel, -params.x_vel_boundary, params.x_vel_boundary, out=self.x_vel)
+        self.x += self.x_vel
+        self.x_acc[:] = 0
+        # rotation
+        np.clip(self.rotation_angle, -30, 30, out=self.rotation_angle)
+        self.rotation_angle -= np.sign(self.rotation_angle) * 2
+
+    def cargo_center(self):
+        # center of the 10x10 pygame.Rect hanging under the drone, pygame truncates the float corner
+        cargo_x = np.trunc(self.x + (self.params.img_width / 2) - 5) + 5
+        cargo_y = np.trunc(self.y + (self.params.img_height / 2) + 6) + 5
+        return cargo_x, cargo_y
+
+    def distance_to_target(self, target_x, target_y):
+        cargo_x, cargo_y = self.cargo_center()
+        return np.hypot(target_x - cargo_x, target_y - cargo_y)
+
+
+class Drone:
+    """
+    A single drone for the keyboard and replay modes. It keeps its state in plain floats and steps
+    with move, the scalar twin of DroneSwarm.move, as a swarm of one pays for several NumPy calls a frame.
+    """
+
+    def __init__(self, pos=(340, 200), params=NEAT_PHYSICS):
+        self.params = params
+        # coordinates
+        self.x = float(pos[0])
+        self.y = float(pos[1])
+        # velocity
+        self.y_vel = 0.0
+        self.x_vel = 0.0
+        # acceleration
+        self.y_acc = 0.0
+        self.x_acc = 0.0
+        # rotation
+        self.rotation_angle = 0.0
+
+        self.is_collided = False
+        self.is_dead = False
+        # handed to render.draw_screen, updated from the floats above on every read
+        self._swarm = DroneSwarm(1, pos, params)
+
+    @property
+    def swarm(self):
+        swarm = self._swarm
+        swarm.x[0] = self.x
+        swarm.y[0] = self.y
+        swarm.x_vel[0] = self.x_vel
+        swarm.y_vel[0] = self.y_vel
+        swarm.rotation_angle[0] = self.rotation_angle
+        swarm.is_collided[0] = self.is_collided
+        swarm.is_dead[0] = self.is_dead
+        return swarm
+
+    def go_up(self):
+        self.y_acc = -1
+
+    def go_down(self):
+        self.y_acc = 1
+
+    def go_right(self):
+        self.x_acc = 1
+        self.rotation_angle -= 5
+
+    def go_left(self):
+        self.x_acc = -1
+        self.rotation_angle += 5
+
+    def move(self):
+        # DroneSwarm.move for one drone, with the same results, in plain floats
+        params = self.params
+        drag = params.drag
+        # y movement
+        y_vel = self.y_vel + (self.y_acc + params.gravity)
+        if y_vel < -params.y_vel_boundary:
+            y_vel = -params.y_vel_boundary
+        elif y_vel > params.y_vel_boundary:
+            y_vel = params.y_vel_boundary
+        if params.y_drag:
+            if y_vel > 0:
+                y_vel -= drag
+            elif y_vel < 0:
+                y_vel += drag
+        self.y += y_vel
+        self.y_vel = y_vel
+        self.y_acc = 0
+        # x movement
+        x_vel = self.x_vel + self.x_acc
+        if x_vel > 0:
+            x_vel -= drag
+        elif x_vel < 0:
+            x_vel += drag
+        if params.x_vel_boundary is not None:
+            if x_vel > params.x_vel_boundary:
+                x_vel = params.x_vel_boundary
+            elif x_vel < -params.x_vel_boundary:
+                x_vel = -params.x_vel_boundary
+        self.x += x_vel
+        self.x_vel = x_vel
+        self.x_acc = 0
+        # rotation
+        rotation_angle = self.rotation_angle
+        if rotation_angle > 30:
+            rotation_angle = 30
+        elif rotation_angle < -30:
+            rotation_angle = -30
+        if rotation_angle > 0:
+            rotation_angle -= 2
+        elif rotation_angle < 0:
+            rotation_angle += 2
+        self.rotation_angle = rotation_angle
+
+    def cargo_center(self):
+        # DroneSwarm.cargo_center
+        cargo_x = math.trunc(self.x + (self.params.img_width / 2) - 5) + 5.0
+        cargo_y = math.trunc(self.y + (self.params.img_height / 2) + 6) + 5.0
+        return cargo_x, cargo_y
+
+    def distance_to_target(self, target):
+        cargo_x, cargo_y = self.cargo_center()
+        target_x, target_y = target.center()
+        # np.hypot, math.hypot can round the last bit differently
+        return float(np.hypot(target_x - cargo_x, target_y - cargo_y))
+
+
+class Target:
+
+    def __init__(self, pos):
+        self.x = pos[0]
+        self.y = pos[1]
+        self.width = 5
+
+    def center(self):
+        return self.x + (self.width / 2), self.y + (self.width / 2)
+
+
+def random_target(params, margin=30, rng=random):
+    return Target((rng.randint(margin, params.screen_width - margin), rng.randint(margin, params.screen_height - margin)))
+
+
+class EarlyStopping:
+    """
+    Culls drones that have not got closer to their target for `stall_frames` frames, or that
+    can not reach it in the frames left even flying at the velocity caps of DroneSwarm.move.
+    """
+
+    def __init__(self, stall_frames=None, cull_unreachable=False):
+        self.stall_frames = stall_frames
+        self.cull_unreachable = cull_unreachable
+        self.best_distance = None
+        self.stalled_frames = None
+
+    def start(self, distance):
+        self.best_distance = distance.copy()
+        self.stalled_frames = np.zeros(len(distance), dtype=np.int64)
+
+    def cull(self, swarm, alive, distance, frames_left):
+        culled = np.zeros(len(distance), dtype=bool)
+
+        if self.stall_frames is not None:
+            improved = distance < self.best_distance
+            self.best_distance = np.where(improved, distance, self.best_distance)
+            self.stalled_frames = np.where(improved, 0, self.stalled_frames + 1)
+            culled |= self.stalled_frames >= self.stall_frames
+
+        if self.cull_unreachable:
+            # the cargo center moves at most one velocity cap per frame on each axis, plus one pixel of rounding
+            x_vel_boundary = swarm.params.x_vel_boundary
+            if x_vel_boundary is None:
+                x_vel_boundary = np.inf
+            reach = np.hypot(frames_left * x_vel_boundary + 1, frames_left * swarm.params.y_vel_boundary + 1)
+            culled |= distance >= 5 + reach
+
+        return alive & culled
+
+    def compact(self, keep):
+        self.best_distance = self.best_distance[keep]
+        self.stalled_frames = self.stalled_frames[keep]
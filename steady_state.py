@@ -0,0 +1,137 @@
+import queue
+import random
+
+import neat
+
+
+class SteadyStateEvolution:
+    """
+    Asynchronous alternative to neat.Population.run. Small batches of genomes are kept in flight
+    on a multiprocessing pool, every finished batch replaces the worst genomes of the population
+    and the next batch is bred right away, so no worker waits for the slowest genome of a generation.
+    Breeding goes through the population's own DefaultReproduction and species set, one reproduce
+    call yields the offspring of the next pop_size evaluations.
+    """
+
+    def __init__(self, population, pool, task, make_args, workers, batch_size=10, on_result=None, on_generation=None):
+        self.population = population
+        self.pool = pool
+        # task(make_args(genomes, config, generation)) -> (fitness, hit_frames, phase_times)
+        self.task = task
+        self.make_args = make_args
+        # on_result(hit_frames, phase_times) for every finished batch, None ignores them
+        self.on_result = on_result
+        # on_generation(generation) whenever a generation starts, None ignores it
+        self.on_generation = on_generation
+        self.slots = 2 * workers
+        self.batch_size = batch_size
+        self.results = queue.Queue()
+        # genomes with a fitness, the population the offspring are bred from
+        self.evaluated = {}
+        self.pending = []
+
+    def breed(self):
+        p = self.population
+        config = p.config
+        p.species.speciate(config, self.evaluated, p.generation)
+        genome_species = dict(p.species.genome_to_species)
+        offspring = p.reproduction.reproduce(config, p.species, config.pop_size, p.generation)
+        if not p.species.species:
+            p.reporters.complete_extinction()
+            if not config.reset_on_extinction:
+                raise neat.CompleteExtinctionException()
+            offspring = p.reproduction.create_new(config.genome_type, config.genome_config, config.pop_size)
+        # members of the species dropped as stagnant leave the population, as in a generational run
+        self.evaluated = {key: g for key, g in self.evaluated.items()
+                          if genome_species.get(key) in p.species.species}
+        # the elites are already in the population
+        self.pending = [g for key, g in offspring.items() if key not in self.evaluated]
+        random.shuffle(self.pending)
+
+    def submit(self):
+        if not self.pending:
+            if not self.evaluated:
+                return False
+            self.breed()
+        batch = self.pending[:self.batch_size]
+        del self.pending[:self.batch_size]
+        args = self.make_args(batch, self.population.config, self.population.generation)
+        self.pool.apply_async(self.task, (args,), callback=lambda result: self.results.put((batch, result)),
+                              error_callback=lambda e: self.results.put((batch, e)))
+        return True
+
+    def insert(self, batch, fitness):
+        pop_size = self.population.config.pop_size
+        for genome, genome_fitness in zip(batch, fitness):
+            genome.fitness = float(genome_fitness)
+            self.evaluated[genome.key] = genome
+        if len(self.evaluated) > pop_size:
+            ranked = sorted(self.evaluated.values(), key=lambda g: g.fitness)
+            for genome in ranked[:len(self.evaluated) - pop_size]:
+                del self.evaluated[genome.key]
+
+    def end_generation(self):
+        """ Reports every pop_size evaluations like the end of a generation, returns True when solved. """
+        p = self.population
+        config = p.config
+        p.population = dict(self.evaluated)
+        p.species.speciate(config, p.population, p.generation)
+        best = max(p.population.values(), key=lambda g: g.fitness)
+        p.reporters.post_evaluate(config, p.population, p.species, best)
+        if p.best_genome is None or best.fitness > p.best_genome.fitness:
+            p.best_genome = best
+
+        solved = False
+        if not config.no_fitness_termination:
+            fv = p.fitness_criterion(g.fitness for g in p.population.values())
+            if fv >= config.fitness_threshold:
+                p.reporters.found_solution(config, p.generation, best)
+                solved = True
+
+        p.reporters.end_generation(config, p.population, p.species)
+        p.generation += 1
+        return solved
+
+    def start_generation(self):
+        self.population.reporters.start_generation(self.population.generation)
+        if self.on_generation is not None:
+            self.on_generation(self.population.generation)
+
+    def run(self, evaluations):
+        """ Evaluates `evaluations` more genomes, returns the best genome seen. """
+        p = self.population
+        # a restored checkpoint brings its population with the fitness already set
+        for key, genome in p.population.items():
+            if genome.fitness is None:
+                self.pending.append(genome)
+            else:
+                self.evaluated[key] = genome
+
+        pop_size = p.config.pop_size
+        done = 0
+        in_flight = 0
+        self.start_generation()
+        while done < evaluations:
+            while in_flight < self.slots and self.submit():
+                in_flight += 1
+            if in_flight == 0:
+                break
+
+            batch, result = self.results.get()
+            in_flight -= 1
+            if isinstance(result, Exception):
+                raise result
+            fitness, hit_frames, phase_times = result
+            self.insert(batch, fitness)
+            if self.on_result is not None:
+                self.on_result(hit_frames, phase_times)
+
+            generation_end = done // pop_size < (done + len(batch)) // pop_size
+            done += len(batch)
+            if generation_end:
+                if self.end_generation() or done >= evaluations:
+                    break
+                self.start_generation()
+
+        # results still in flight are dropped
+        return p.best_genome
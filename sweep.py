@@ -0,0 +1,199 @@
+import argparse
+import copy
+import csv
+import hashlib
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+
+import neat
+
+import main
+from generation_stats import GenerationStatsReporter, load_stats
+
+# PhysicsParams attributes a sweep may vary, everything else is looked up in the neat config
+PHYSICS_PARAMS = ["gravity", "drag", "y_vel_boundary", "x_vel_boundary", "y_drag"]
+# the [NEAT] section, the other sections list their parameters themselves
+NEAT_PARAMS = ["pop_size", "fitness_criterion", "fitness_threshold", "reset_on_extinction", "no_fitness_termination"]
+CONFIG_SECTIONS = ["genome_config", "species_set_config", "stagnation_config", "reproduction_config"]
+RESULT_COLUMNS = ["trial", "seed", "status", "generations", "best_fitness", "final_best_fitness",
+                  "final_mean_fitness", "final_successes", "wall_time"]
+
+
+def sample(rng, distribution):
+    """
+    One value of a random search parameter: {"uniform": [a, b]}, {"loguniform": [a, b]},
+    {"randint": [a, b]} (b included) or {"choice": [values]}.
+    """
+    (kind, args), = distribution.items()
+    if kind == "uniform":
+        return rng.uniform(*args)
+    if kind == "loguniform":
+        return math.exp(rng.uniform(math.log(args[0]), math.log(args[1])))
+    if kind == "randint":
+        return rng.randint(*args)
+    if kind == "choice":
+        return rng.choice(args)
+    raise ValueError("Unknown distribution: {0}".format(kind))
+
+
+def expand_trials(spec):
+    """
+    The trials of a sweep spec, every grid point combined with every random sample and every seed.
+    A spec is a dict with any of
+        "grid":     {parameter: [values]}
+        "random":   {parameter: distribution}, drawn "samples" times from "search_seed"
+        "seeds":    [seeds], or "repeats": n for the seeds 0 to n - 1
+    The samples only depend on the spec, so a resumed sweep rebuilds the same trials.
+    """
+    grid = spec.get("grid", {})
+    names = sorted(grid)
+    points = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+    rng = random.Random(spec.get("search_seed", 0))
+    distributions = spec.get("random", {})
+    samples = [{name: sample(rng, distributions[name]) for name in sorted(distributions)}
+               for _ in range(spec.get("samples", 1) if distributions else 1)]
+
+    seeds = spec.get("seeds", list(range(spec.get("repeats", 1))))
+    trials = []
+    for point in points:
+        for random_params in samples:
+            params = dict(point, **random_params)
+            for seed in seeds:
+                key = json.dumps([params, seed], sort_keys=True)
+                trials.append({"trial": hashlib.sha1(key.encode()).hexdigest()[:12], "seed": seed, "params": params})
+    return trials
+
+
+def build_config(config_path, params):
+    """ Parses config_path and overrides the neat parameters in params in memory. """
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                neat.DefaultSpeciesSet, neat.DefaultStagnation, config_path)
+    for name, value in params.items():
+        if name in PHYSICS_PARAMS:
+            continue
+        if name in NEAT_PARAMS:
+            setattr(config, name, value)
+            continue
+        for section in CONFIG_SECTIONS:
+            section_config = getattr(config, section)
+            if name in [param.name for param in section_config._params]:
+                setattr(section_config, name, value)
+                break
+        else:
+            raise ValueError("Unknown sweep parameter: {0}".format(name))
+    return config
+
+
+def build_physics(params):
+    physics = copy.copy(main.NEAT_PHYSICS)
+    for name in PHYSICS_PARAMS:
+        if name in params:
+            setattr(physics, name, params[name])
+    return physics
+
+
+def run_trial(args):
+    """ Pool entry point, evolves one trial headless in this process and returns its result row. """
+    trial, config_path, generations, targets, stats_dir = args
+    params = trial["params"]
+    config = build_config(config_path, params)
+
+    # the training script state a fresh main.run would start from
+    main.PHYSICS = build_physics(params)
+    main.GEN = 0
+    main.SEED = trial["seed"]
+    main.TARGETS_PER_GENOME = targets
+    main.FIXED_TARGETS = False
+    main.VIEWER = main.RECORDER = main.POOL = main.DISTRIBUTED = main.CACHE = main.EARLY_STOPPING = None
+    random.seed(trial["seed"])
+
+    start = time.perf_counter()
+    p = neat.Population(config)
+    # a stats file left by an interrupted sweep is started over
+    stats = GenerationStatsReporter(os.path.join(stats_dir, trial["trial"] + ".csv"), main.FPS)
+    main.STATS = stats
+    p.add_reporter(stats)
+    status = "done"
+    try:
+        p.run(main.main, generations)
+    except neat.CompleteExtinctionException:
+        status = "extinct"
+
+    wall_time = time.perf_counter() - start
+
+    # the population left by p.run is the unevaluated next one, the last evaluated generation is the last row
+    history = load_stats(stats.path)
+    evaluated = len(history["generation"])
+    row = {"trial": trial["trial"], "seed": trial["seed"], "status": status, "generations": evaluated,
+           "best_fitness": p.best_genome.fitness if p.best_genome is not None else "",
+           "final_best_fitness": history["fitness_max"][-1] if evaluated else "",
+           "final_mean_fitness": history["fitness_mean"][-1] if evaluated else "",
+           "final_successes": int(history["successes"][-1]) if evaluated else "", "wall_time": wall_time}
+    row.update(params)
+    return row
+
+
+def completed_trials(results_path):
+    if not os.path.exists(results_path):
+        return set()
+    with open(results_path, newline="") as f:
+        return {row["trial"] for row in csv.DictReader(f)}
+
+
+def run_sweep(spec, config_path, results_path, workers=None):
+    """
+    Runs the trials of spec that have no row in results_path yet on `workers` processes (all cores
+    if None), appending one row per finished trial. Every trial writes its generation statistics
+    to a file named after it next to the results.
+    """
+    trials = expand_trials(spec)
+    param_names = sorted({name for trial in trials for name in trial["params"]})
+    done = completed_trials(results_path)
+    pending = [trial for trial in trials if trial["trial"] not in done]
+    print("{0} trials, {1} already done".format(len(trials), len(trials) - len(pending)))
+
+    stats_dir = os.path.splitext(results_path)[0] + "-trials"
+    os.makedirs(stats_dir, exist_ok=True)
+    if not os.path.exists(results_path):
+        with open(results_path, "w", newline="") as f:
+            csv.writer(f).writerow(RESULT_COLUMNS + param_names)
+    with open(results_path, newline="") as f:
+        columns = next(csv.reader(f))
+    if set(param_names) - set(columns):
+        raise ValueError("{0} was written for other parameters: {1}".format(results_path, columns))
+
+    args = [(trial, config_path, spec.get("generations", 50), spec.get("targets", 1), stats_dir)
+            for trial in pending]
+    # a fresh process per trial, so no trial inherits the module state of the one before
+    pool = multiprocessing.Pool(workers, maxtasksperchild=1)
+    try:
+        for row in pool.imap_unordered(run_trial, args):
+            # one row per finished trial, an interrupted sweep loses only the trials in flight
+            with open(results_path, "a", newline="") as f:
+                csv.DictWriter(f, columns).writerow(row)
+            print("Trial {0} seed {1}: best fitness {2}, {3:.1f}s".format(
+                row["trial"], row["seed"], row["best_fitness"], row["wall_time"]))
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="run a grid or random search of training runs")
+    parser.add_argument("spec", help="JSON sweep spec, see expand_trials")
+    parser.add_argument("--results", default="sweep-results.csv",
+                        help="results table, trials already in it are not run again")
+    parser.add_argument("--workers", type=int, default=None, help="processes to run trials on, all cores by default")
+    args = parser.parse_args()
+
+    with open(args.spec) as f:
+        spec = json.load(f)
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-feedforward.txt")
+    run_sweep(spec, config_path, args.results, args.workers)
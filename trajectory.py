@@ -0,0 +1,159 @@
+import mmap
+import os
+import struct
+
+import numpy as np
+
+# file layout, all little endian:
+#   header      magic, version, reserved, screen width, screen height
+#   chunks      one per recorded episode: chunk magic, generation, frames, drones,
+#               then the CHUNK_ARRAYS below in order, each padded to 8 bytes
+# drone k * genomes + i of a chunk flew genome i to target k, like the rows of main.simulate
+MAGIC = b"DRTJ"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+CHUNK_MAGIC = b"CHNK"
+CHUNK_HEADER = struct.Struct("<4sIII")
+
+CHUNK_ARRAYS = [
+    ("genome_key", "<i8", "drones"),
+    ("fitness", "<f8", "drones"),
+    ("target_x", "<f4", "drones"),
+    ("target_y", "<f4", "drones"),
+    ("hit_frame", "<i4", "drones"),
+    ("x", "<f4", "frames"),
+    ("y", "<f4", "frames"),
+    ("rotation", "<i1", "frames"),
+    ("alive", "<u1", "frames"),
+]
+
+
+def padding(size):
+    return -size % 8
+
+
+class Episode:
+    """
+    Collects the frames of one simulated episode. A drone resolved before the end keeps
+    its last position with alive 0, so every frame has a row for every drone.
+    """
+
+    def __init__(self, size, pos):
+        self.x = np.full(size, pos[0], dtype="<f4")
+        self.y = np.full(size, pos[1], dtype="<f4")
+        self.rotation = np.zeros(size, dtype="<i1")
+        self.frames = {"x": [], "y": [], "rotation": [], "alive": []}
+
+    def frame(self, swarm):
+        # swarm.index maps the compacted rows back to the drones of the episode
+        self.x[swarm.index] = swarm.x
+        self.y[swarm.index] = swarm.y
+        self.rotation[swarm.index] = swarm.rotation_angle
+        alive = np.zeros(len(self.x), dtype="<u1")
+        alive[swarm.index] = swarm.alive()
+        self.frames["x"].append(self.x.copy())
+        self.frames["y"].append(self.y.copy())
+        self.frames["rotation"].append(self.rotation.copy())
+        self.frames["alive"].append(alive)
+
+
+class TrajectoryRecorder:
+    """
+    Appends the episodes of the top_k genomes by fitness (all if None) of every `every`th
+    generation to a trajectory log, one chunk per episode, for replay.py to render offline.
+    """
+
+    def __init__(self, path, width, height, top_k=5, every=1):
+        self.path = path
+        self.top_k = top_k
+        self.every = every
+        # resumed runs keep appending to the same log
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, 0, width, height))
+
+    def records(self, generation):
+        return generation % self.every == 0
+
+    def select(self, fitness):
+        order = np.argsort(-np.asarray(fitness), kind="stable")
+        return order if self.top_k is None else order[:self.top_k]
+
+    def write(self, generation, episode, genome_keys, fitness, targets, hit_frames):
+        """ fitness and genome_keys per genome, hit_frames per target and genome as main.simulate returns them """
+        targets_count = len(targets)
+        arrays = {
+            "genome_key": np.tile(np.asarray(genome_keys, dtype="<i8"), targets_count),
+            "fitness": np.tile(np.asarray(fitness, dtype="<f8"), targets_count),
+            "target_x": np.repeat([target.x for target in targets], len(genome_keys)).astype("<f4"),
+            "target_y": np.repeat([target.y for target in targets], len(genome_keys)).astype("<f4"),
+            "hit_frame": np.asarray(hit_frames, dtype="<i4").ravel(),
+        }
+        for name in ["x", "y", "rotation", "alive"]:
+            arrays[name] = np.stack(episode.frames[name])
+        frames, drones = arrays["x"].shape
+
+        with open(self.path, "ab") as f:
+            f.write(CHUNK_HEADER.pack(CHUNK_MAGIC, generation, frames, drones))
+            for name, _, _ in CHUNK_ARRAYS:
+                data = arrays[name].tobytes()
+                f.write(data + b"\0" * padding(len(data)))
+
+
+class Chunk:
+    """ One recorded episode, the per frame arrays are (frames, drones). """
+
+    def __init__(self, generation, arrays):
+        self.generation = generation
+        for name, array in arrays.items():
+            setattr(self, name, array)
+
+    @property
+    def frames(self):
+        return self.x.shape[0]
+
+    @property
+    def drones(self):
+        return self.x.shape[1]
+
+
+def load_trajectories(path, mmap_mode=True):
+    """
+    Reads a trajectory log as (width, height, chunks). With mmap_mode the arrays are views of the file,
+    so scrubbing through a long log only loads the frames that are looked at. A chunk cut short by an
+    interrupted run is left out.
+    """
+    with open(path, "rb") as f:
+        if mmap_mode:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = f.read()
+
+    magic, version, _, width, height = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("{0} is not a trajectory log".format(path))
+    if version != VERSION:
+        raise ValueError("Unsupported trajectory log version {0} in {1}".format(version, path))
+
+    chunks = []
+    offset = HEADER.size
+    while offset + CHUNK_HEADER.size <= len(buffer):
+        magic, generation, frames, drones = CHUNK_HEADER.unpack_from(buffer, offset)
+        if magic != CHUNK_MAGIC:
+            raise ValueError("Corrupt trajectory log {0} at byte {1}".format(path, offset))
+        sizes = {"drones": drones, "frames": frames * drones}
+        end = offset + CHUNK_HEADER.size
+        for _, dtype, size in CHUNK_ARRAYS:
+            nbytes = sizes[size] * np.dtype(dtype).itemsize
+            end += nbytes + padding(nbytes)
+        if end > len(buffer):
+            break
+
+        offset += CHUNK_HEADER.size
+        arrays = {}
+        for name, dtype, size in CHUNK_ARRAYS:
+            array = np.frombuffer(buffer, dtype=dtype, count=sizes[size], offset=offset)
+            offset += array.nbytes + padding(array.nbytes)
+            arrays[name] = array.reshape(frames, drones) if size == "frames" else array
+        chunks.append(Chunk(generation, arrays))
+    return width, height, chunks
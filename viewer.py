@@ -0,0 +1,57 @@
+import time
+
+import numpy as np
+import pygame
+
+from render import draw_screen
+from resources import init_pygame
+
+
+class Viewer:
+    """
+    Watches a simulation without slowing it down. The simulation hands over every frame and keeps
+    running at full speed, the viewer only draws when 1 / fps seconds have passed since its last
+    draw, only the top_k drones by fitness so far (all if None), and only every `every`th generation.
+    """
+
+    def __init__(self, width, height, fps=30, top_k=None, every=1, caption="Drone - NEAT"):
+        self.width = width
+        self.height = height
+        self.interval = 1.0 / fps if fps else 0.0
+        self.top_k = top_k
+        self.every = every
+        self.caption = caption
+        self.screen = None
+        self.last_draw = 0.0
+
+    def shows(self, generation):
+        return generation % self.every == 0
+
+    def open(self):
+        if self.screen is None:
+            init_pygame()
+            self.screen = pygame.display.set_mode((self.width, self.height))
+            pygame.display.set_caption(self.caption)
+        return self.screen
+
+    def frame(self, swarm, targets, target_x, target_y, fitness, text=(), sprites=True):
+        """ fitness: the running fitness of every drone of the episode, indexed by swarm.index """
+        if time.perf_counter() - self.last_draw < self.interval:
+            return
+        screen = self.open()
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                quit()
+
+        shown = swarm.alive()
+        if self.top_k is not None and shown.sum() > self.top_k:
+            live = np.flatnonzero(shown)
+            best = live[np.argpartition(-fitness[swarm.index[live]], self.top_k - 1)[:self.top_k]]
+            shown = np.zeros(swarm.size, dtype=bool)
+            shown[best] = True
+        draw_screen(screen, swarm, targets, target_x, target_y, text=text, sprites=sprites, rows=np.flatnonzero(shown))
+        pygame.display.update()
+        # counted from the end of the draw, so a slow draw still leaves the simulation its interval
+        self.last_draw = time.perf_counter()